@@ -32,7 +32,15 @@ class GameAdmin(admin.ModelAdmin):
         "black_elo",
     ]
     list_display_links = ["id"]
-    list_filter = ["event", "result", "source_format", "date", "opening"]
-    search_fields = ["white_player", "black_player", "event"]
+    list_select_related = ("opening",)
+    list_filter = ["event", "result", "source_format", "date"]
+    search_fields = [
+        "white_player",
+        "black_player",
+        "event",
+        "opening__eco_code",
+        "opening__name",
+    ]
+    autocomplete_fields = ("opening",)
     date_hierarchy = "date"
     readonly_fields = ["source_id", "created_at"]
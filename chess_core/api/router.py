@@ -17,8 +17,8 @@ from chess_core.api.schemas import (
 from chess_core.services.latest_game import get_latest_game_for_opening
 from chess_core.services.opening_game_details import get_opening_game_details
 from chess_core.services.opening_stats import (
+    OPENING_STATS_SERVICE,
     OpeningStatsFilterParams,
-    OpeningStatsService,
 )
 from chess_core.services.win_rate_over_time import (
     WinRateOverTimeFilterParams,
@@ -58,8 +58,6 @@ def get_opening_stats(
     Returns:
         OpeningStatsResponse with list of opening statistics and total count.
     """
-    service = OpeningStatsService()
-
     # Convert API schema to service filter params
     filter_params = OpeningStatsFilterParams(
         white_player=filters.white_player,
@@ -81,7 +79,7 @@ def get_opening_stats(
         page_size=filters.page_size,
     )
 
-    results, total_count = service.get_stats(filter_params)
+    results, total_count = OPENING_STATS_SERVICE.get_stats(filter_params)
 
     # Transform query results to response schema
     items = [
@@ -97,7 +95,7 @@ def get_opening_stats(
             white_pct=r["white_pct"],
             draw_pct=r["draw_pct"],
             black_pct=r["black_pct"],
-            avg_moves=round(r["avg_moves"], 2) if r["avg_moves"] else None,
+            avg_moves=r["avg_moves"],
         )
         for r in results
     ]
@@ -4,7 +4,14 @@ from datetime import date
 from typing import Literal
 
 from ninja import Schema
-from pydantic import Field
+from pydantic import (
+    Field,
+    PositiveInt,
+    ValidationError,
+    ValidationInfo,
+    ValidatorFunctionWrapHandler,
+    field_validator,
+)
 
 
 class LatestGameSchema(Schema):
@@ -220,3 +227,39 @@ class WinRateOverTimeFilterSchema(Schema):
     black_elo_max: int | None = None
     min_games: int = 1
     opening_threshold: int | None = None
+
+
+class ExploreChartFilterSchema(Schema):
+    """Explorer query parameters that drive the win-rate chart.
+
+    Reads chart_period and threshold from the explorer form. Blank or
+    invalid values fall back to their defaults so a bad filter never
+    breaks the page.
+    """
+
+    period: Literal["week", "month", "year"] = Field(
+        "week", validation_alias="chart_period"
+    )
+    date_from: date | None = None
+    date_to: date | None = None
+    eco_code: str | None = None
+    opening_name: str | None = None
+    min_games: PositiveInt = Field(1, validation_alias="threshold")
+    opening_threshold: PositiveInt | None = None
+
+    @field_validator("*", mode="wrap")
+    @classmethod
+    def default_when_invalid(
+        cls,
+        value: object,
+        handler: ValidatorFunctionWrapHandler,
+        info: ValidationInfo,
+    ) -> object:
+        """Replace blank or invalid values with the field default."""
+        default = cls.model_fields[info.field_name].default
+        if value == "":
+            return default
+        try:
+            return handler(value)
+        except ValidationError:
+            return default
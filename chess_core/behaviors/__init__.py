@@ -1,5 +1,5 @@
 """Chess position behaviors (e.g. endgame detection from FEN)."""
 
-from .endgame import ENDGAME_THRESHOLD, is_endgame
+from .endgame import ENDGAME_THRESHOLD, is_endgame, is_endgame_board
 
-__all__ = ["ENDGAME_THRESHOLD", "is_endgame"]
+__all__ = ["ENDGAME_THRESHOLD", "is_endgame", "is_endgame_board"]
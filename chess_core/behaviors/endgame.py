@@ -1,4 +1,6 @@
-"""Endgame detection derived from FEN."""
+"""Endgame detection derived from FEN or a board."""
+
+import chess
 
 ENDGAME_THRESHOLD = 6
 MINOR_OR_MAJOR_PIECES = "NBRQnbrq"
@@ -21,3 +23,19 @@ def is_endgame(fen: str) -> bool:
     piece_placement = fen.split()[0]
     count = sum(1 for c in piece_placement if c in MINOR_OR_MAJOR_PIECES)
     return count <= ENDGAME_THRESHOLD
+
+
+def is_endgame_board(board: chess.Board) -> bool:
+    """Return True if the board's position is in the endgame.
+
+    Same rule as is_endgame, counted straight from the board's bitboards
+    so callers replaying a game need not build a FEN for every position.
+
+    Args:
+        board: The board to check.
+
+    Returns:
+        True if ENDGAME_THRESHOLD or fewer N/B/R/Q pieces remain, False otherwise.
+    """
+    pieces = board.knights | board.bishops | board.rooks | board.queens
+    return pieces.bit_count() <= ENDGAME_THRESHOLD
@@ -42,9 +42,13 @@ class Command(BaseCommand):
             self.stdout.write("Processing all games (--force mode)")
         else:
             queryset = Game.objects.filter(
-                Q(endgame_move_ply__isnull=True) | Q(endgame_fen__isnull=True) | Q(endgame_fen="")
+                Q(endgame_move_ply__isnull=True)
+                | Q(endgame_fen__isnull=True)
+                | Q(endgame_fen="")
+            )
+            self.stdout.write(
+                "Processing games without endgame_move_ply or endgame_fen"
             )
-            self.stdout.write("Processing games without endgame_move_ply or endgame_fen")
 
         total_games = queryset.count()
         if total_games == 0:
@@ -60,18 +64,22 @@ class Command(BaseCommand):
         processed = 0
         updated = 0
 
-        game_ids = list(queryset.values_list("id", flat=True))
+        # Load only what detection reads; bulk_update writes the rest.
+        pending = queryset.order_by("id").only("id", "moves")
 
-        for i in range(0, len(game_ids), batch_size):
-            batch_ids = game_ids[i : i + batch_size]
-            batch = list(Game.objects.filter(id__in=batch_ids))
+        # Page by id so each batch query seeks the primary key
+        last_id = 0
+        while batch := list(pending.filter(id__gt=last_id)[:batch_size]):
+            last_id = batch[-1].id
             games_to_update = []
 
             for game in batch:
                 entry = detector.detect_endgame(game.moves)
                 if entry is not None:
                     game.endgame_move_ply = entry.ply
-                    game.endgame_fen = entry.fen[:100] if len(entry.fen) > 100 else entry.fen
+                    game.endgame_fen = (
+                        entry.fen[:100] if len(entry.fen) > 100 else entry.fen
+                    )
                     games_to_update.append(game)
 
                 processed += 1
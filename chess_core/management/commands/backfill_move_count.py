@@ -3,9 +3,30 @@
 import time
 
 from django.core.management.base import BaseCommand
+from django.db import connection
 from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
 
 from chess_core.models import Game
+from chess_core.repositories import GameRepository
+from chess_core.services.move_parsing import count_plies
+
+# PostgreSQL counterpart of count_plies for the moves column: counts
+# whitespace-separated tokens that are not move numbers ("1.", "1...", "12")
+# or result markers, and yields NULL when none remain.
+MOVE_COUNT_PLY_SQL = r"""
+    NULLIF(
+        (
+            SELECT count(*)
+            FROM regexp_split_to_table(btrim(moves), '\s+') AS token
+            WHERE token <> ''
+                AND token !~ '\.$'
+                AND token !~ '^[0-9.]*[0-9][0-9.]*$'
+                AND token NOT IN ('1-0', '0-1', '1/2-1/2', '*')
+        ),
+        0
+    )
+"""
 
 
 class Command(BaseCommand):
@@ -18,8 +39,8 @@ class Command(BaseCommand):
         parser.add_argument(
             "--batch-size",
             type=int,
-            default=1000,
-            help="Number of games to process per batch (default: 1000)",
+            default=10000,
+            help="Number of games to process per batch (default: 10000)",
         )
         parser.add_argument(
             "--force",
@@ -51,76 +72,109 @@ class Command(BaseCommand):
         self.stdout.write("")
 
         start_time = time.time()
+        if connection.vendor == "postgresql":
+            processed, updated = self._backfill_batches_in_database(
+                queryset, batch_size, total_games
+            )
+        else:
+            processed, updated = self._backfill_batches(
+                queryset, batch_size, total_games
+            )
+
+        elapsed = time.time() - start_time
+
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"Completed in {elapsed:.2f} seconds"))
+        self.stdout.write(self.style.SUCCESS(f"Games processed: {processed}"))
+        self.stdout.write(self.style.SUCCESS(f"Games updated: {updated}"))
+
+        # Show summary stats
+        total_with_count = Game.objects.filter(move_count_ply__isnull=False).count()
+        total_without_count = Game.objects.filter(move_count_ply__isnull=True).count()
+        self.stdout.write("")
+        self.stdout.write(f"Games with move_count_ply: {total_with_count}")
+        self.stdout.write(f"Games without move_count_ply: {total_without_count}")
+
+    def _backfill_batches(
+        self, queryset: QuerySet[Game], batch_size: int, total_games: int
+    ) -> tuple[int, int]:
+        """Count moves in Python and write them back batch by batch.
+
+        Args:
+            queryset: Games to process.
+            batch_size: Number of games to process per batch.
+            total_games: Number of games in queryset, for progress output.
+
+        Returns:
+            Tuple of (games processed, games updated).
+        """
         processed = 0
         updated = 0
 
-        # Get all game IDs to process (to avoid queryset changes during iteration)
-        game_ids = list(queryset.values_list("id", flat=True))
+        repository = GameRepository()
+        pending = queryset.order_by("id").values_list("id", "moves")
 
-        # Process in batches
-        for i in range(0, len(game_ids), batch_size):
-            batch_ids = game_ids[i : i + batch_size]
-            batch = list(Game.objects.filter(id__in=batch_ids))
+        # Process in batches, paging by id so each query seeks the primary key
+        last_id = 0
+        while batch := list(pending.filter(id__gt=last_id)[:batch_size]):
+            last_id = batch[-1][0]
 
-            games_to_update = []
+            move_counts: dict[int, int] = {}
 
-            for game in batch:
-                move_count_ply = self._count_moves(game.moves)
+            for game_id, moves in batch:
+                move_count_ply = count_plies(moves)
                 if move_count_ply is not None:
-                    game.move_count_ply = move_count_ply
-                    games_to_update.append(game)
+                    move_counts[game_id] = move_count_ply
 
                 processed += 1
 
-            # Bulk update the batch
-            if games_to_update:
-                Game.objects.bulk_update(
-                    games_to_update,
-                    ["move_count_ply"],
-                )
-                updated += len(games_to_update)
+            # Write the batch in one UPDATE
+            updated += repository.update_field(move_counts, "move_count_ply")
 
             self.stdout.write(
                 f"Processed {processed}/{total_games} games, "
                 f"updated {updated} with move_count_ply"
             )
 
-        elapsed = time.time() - start_time
+        return processed, updated
 
-        self.stdout.write("")
-        self.stdout.write(self.style.SUCCESS(f"Completed in {elapsed:.2f} seconds"))
-        self.stdout.write(self.style.SUCCESS(f"Games processed: {processed}"))
-        self.stdout.write(self.style.SUCCESS(f"Games updated: {updated}"))
-
-        # Show summary stats
-        total_with_count = Game.objects.filter(move_count_ply__isnull=False).count()
-        total_without_count = Game.objects.filter(move_count_ply__isnull=True).count()
-        self.stdout.write("")
-        self.stdout.write(f"Games with move_count_ply: {total_with_count}")
-        self.stdout.write(f"Games without move_count_ply: {total_without_count}")
+    def _backfill_batches_in_database(
+        self, queryset: QuerySet[Game], batch_size: int, total_games: int
+    ) -> tuple[int, int]:
+        """Count moves in PostgreSQL and write them back batch by batch.
 
-    def _count_moves(self, moves: str) -> int | None:
-        """Count the number of half-moves (ply) in a move string.
+        Each batch is one UPDATE over an id range, so no moves text is sent
+        back and row locks are held for one batch at a time. Games with no
+        moves to count are left unchanged, as in _backfill_batches.
 
         Args:
-            moves: A move string in SAN format, e.g., "1. e4 e5 2. Nf3 Nc6".
+            queryset: Games to process.
+            batch_size: Number of games to process per batch.
+            total_games: Number of games in queryset, for progress output.
 
         Returns:
-            The number of half-moves (ply), or None if moves is empty.
+            Tuple of (games processed, games updated).
         """
-        if not moves:
-            return None
-
-        tokens = moves.split()
-        move_count = 0
-
-        for token in tokens:
-            # Skip move numbers (e.g., "1.", "2.", "1...")
-            if token.endswith(".") or token.replace(".", "").isdigit():
-                continue
-            # Skip result markers
-            if token in ("1-0", "0-1", "1/2-1/2", "*"):
-                continue
-            move_count += 1
-
-        return move_count if move_count > 0 else None
+        processed = 0
+        updated = 0
+
+        pending = queryset.order_by("id").values_list("id", flat=True)
+        countable = queryset.alias(counted_ply=RawSQL(MOVE_COUNT_PLY_SQL, ())).filter(
+            counted_ply__isnull=False
+        )
+
+        # Page by id like _backfill_batches; only the ids come back
+        last_id = 0
+        while batch := list(pending.filter(id__gt=last_id)[:batch_size]):
+            updated += countable.filter(id__gt=last_id, id__lte=batch[-1]).update(
+                move_count_ply=RawSQL(MOVE_COUNT_PLY_SQL, ())
+            )
+            last_id = batch[-1]
+            processed += len(batch)
+
+            self.stdout.write(
+                f"Processed {processed}/{total_games} games, "
+                f"updated {updated} with move_count_ply"
+            )
+
+        return processed, updated
@@ -1,12 +1,42 @@
 """Management command to detect openings for existing games."""
 
+import multiprocessing
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
 from django.core.management.base import BaseCommand
-from django.db.models import QuerySet
+from django.db.models import Count, QuerySet
 
-from chess_core.models import Game, Opening
-from chess_core.services.openings import OpeningDetector
+from chess_core.models import Game
+from chess_core.repositories import GameRepository
+from chess_core.services.openings import OpeningDetector, opening_fen_to_id
+
+# Detector of a worker process, built once by _init_worker.
+_worker_detector: OpeningDetector | None = None
+
+
+def _init_worker(fen_set: frozenset[str]) -> None:
+    """Build the worker's detector from the parent's opening FENs."""
+    global _worker_detector
+    _worker_detector = OpeningDetector(fen_set=fen_set)
+
+
+def _detect_fens(
+    moves_list: list[str], detector: OpeningDetector | None = None
+) -> list[str | None]:
+    """Detect the opening FEN of each move string.
+
+    Args:
+        moves_list: Move strings in SAN format.
+        detector: Detector to use; defaults to the worker's detector.
+
+    Returns:
+        The deepest matching opening FEN per move string, or None.
+    """
+    detector = detector or _worker_detector
+    matches = (detector.detect_opening(moves) for moves in moves_list)
+    return [match.fen if match else None for match in matches]
 
 
 class Command(BaseCommand):
@@ -19,29 +49,26 @@ class Command(BaseCommand):
         parser.add_argument(
             "--batch-size",
             type=int,
-            default=1000,
-            help="Number of games to process per batch (default: 1000)",
+            default=10000,
+            help="Number of games to process per batch (default: 10000)",
         )
         parser.add_argument(
             "--force",
             action="store_true",
             help="Re-detect openings even if already set",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes used to detect openings (default: 1)",
+        )
 
     def handle(self, *args, **options):
         """Execute the detect command."""
         batch_size = options["batch_size"]
         force = options["force"]
-
-        # Initialize detector
-        self.stdout.write("Loading opening database...")
-        detector = OpeningDetector()
-        self.stdout.write(f"Loaded {len(detector._fen_set)} opening positions")
-
-        # Build FEN → Opening ID cache
-        fen_to_opening_id: dict[str, int] = dict(
-            Opening.objects.values_list("fen", "id")
-        )
+        workers = options["workers"]
 
         # Get games to process
         queryset: QuerySet[Game]
@@ -57,46 +84,76 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS("No games to process"))
             return
 
+        # Use the process-wide FEN → Opening ID mapping. Only loaded once
+        # there is work, so the no-op run is a single COUNT.
+        self.stdout.write("Loading opening database...")
+        fen_to_opening_id = opening_fen_to_id()
+        fen_set = frozenset(fen_to_opening_id)
+        repository = GameRepository()
+        self.stdout.write(f"Loaded {len(fen_set)} opening positions")
+
         self.stdout.write(f"Found {total_games} games to process")
         self.stdout.write(f"Batch size: {batch_size}")
+        self.stdout.write(f"Workers: {workers}")
         self.stdout.write("")
 
         start_time = time.time()
         processed = 0
         updated = 0
 
-        # Get all game IDs to process (to avoid queryset changes during iteration)
-        game_ids = list(queryset.values_list("id", flat=True))
-
-        # Process in batches
-        for i in range(0, len(game_ids), batch_size):
-            batch_ids = game_ids[i : i + batch_size]
-            batch = list(Game.objects.filter(id__in=batch_ids))
-
-            games_to_update = []
-
-            for game in batch:
-                match = detector.detect_opening(game.moves)
-                if match:
-                    opening_id = fen_to_opening_id.get(match.fen)
+        pending = queryset.order_by("id").values_list("id", "moves")
+
+        # Workers are forked so they inherit the configured Django apps; each
+        # builds its detector once from the parent's FEN set, without queries.
+        # Only a single-process run needs a detector of its own.
+        detector = None
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+                initargs=(fen_set,),
+            )
+        else:
+            detector = OpeningDetector(fen_set=fen_set)
+
+        try:
+            # Process in batches, paging by id so each query seeks the primary key
+            last_id = 0
+            while batch := list(pending.filter(id__gt=last_id)[:batch_size]):
+                last_id = batch[-1][0]
+                moves_list = [moves for _, moves in batch]
+
+                if pool is None:
+                    fens = _detect_fens(moves_list, detector)
+                else:
+                    chunk_size = -(-len(moves_list) // workers)
+                    chunks = [
+                        moves_list[j : j + chunk_size]
+                        for j in range(0, len(moves_list), chunk_size)
+                    ]
+                    fens = list(chain.from_iterable(pool.map(_detect_fens, chunks)))
+
+                opening_ids: dict[int, int] = {}
+
+                for (game_id, _), fen in zip(batch, fens):
+                    opening_id = fen_to_opening_id.get(fen) if fen else None
                     if opening_id:
-                        game.opening_id = opening_id
-                        games_to_update.append(game)
+                        opening_ids[game_id] = opening_id
 
-                processed += 1
+                processed += len(batch)
 
-            # Bulk update the batch
-            if games_to_update:
-                Game.objects.bulk_update(
-                    games_to_update,
-                    ["opening_id"],
-                )
-                updated += len(games_to_update)
+                # Write the batch in one UPDATE
+                updated += repository.update_field(opening_ids, "opening")
 
-            self.stdout.write(
-                f"Processed {processed}/{total_games} games, "
-                f"updated {updated} with openings"
-            )
+                self.stdout.write(
+                    f"Processed {processed}/{total_games} games, "
+                    f"updated {updated} with openings"
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown()
 
         elapsed = time.time() - start_time
 
@@ -105,9 +162,12 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"Games processed: {processed}"))
         self.stdout.write(self.style.SUCCESS(f"Games updated with openings: {updated}"))
 
-        # Show summary stats
-        total_with_opening = Game.objects.filter(opening__isnull=False).count()
-        total_without_opening = Game.objects.filter(opening__isnull=True).count()
+        # Show summary stats; Count("opening") skips NULL opening_ids
+        totals = Game.objects.aggregate(
+            with_opening=Count("opening"), total=Count("id")
+        )
+        total_with_opening = totals["with_opening"]
+        total_without_opening = totals["total"] - total_with_opening
         self.stdout.write("")
         self.stdout.write(f"Games with openings: {total_with_opening}")
         self.stdout.write(f"Games without openings: {total_without_opening}")
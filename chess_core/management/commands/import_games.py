@@ -38,12 +38,51 @@ class Command(BaseCommand):
             default=1000,
             help="Number of games to insert per batch (default: 1000)",
         )
+        parser.add_argument(
+            "--update-existing",
+            action="store_true",
+            help="Overwrite games that were already imported instead of skipping them",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes used to parse each file (default: 1)",
+        )
+        parser.add_argument(
+            "--writer-threads",
+            type=int,
+            default=0,
+            help=(
+                "Write batches on this many background threads so parsing "
+                "overlaps database writes (default: 0, write inline). More "
+                "than 1 is not supported on SQLite"
+            ),
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Load batches with PostgreSQL COPY (ignored on other databases)",
+        )
+        parser.add_argument(
+            "--no-validate",
+            action="store_true",
+            help=(
+                "Split games with a lightweight scanner instead of replaying "
+                "moves; faster, but SAN is stored as written in the file"
+            ),
+        )
 
     def handle(self, *args, **options):
         """Execute the import command."""
         path = Path(options["path"])
         file_format = options["format"]
         batch_size = options["batch_size"]
+        update_existing = options["update_existing"]
+        workers = options["workers"]
+        writer_threads = options["writer_threads"]
+        use_copy = options["copy"]
+        validate = not options["no_validate"]
 
         if not path.exists():
             raise CommandError(f"Path not found: {path}")
@@ -58,7 +97,7 @@ class Command(BaseCommand):
             if not files_to_import:
                 raise CommandError(f"No {glob} files found in directory: {path}")
 
-        parser = self._get_parser(file_format)
+        parser = self._get_parser(file_format, workers, validate)
         if parser is None:
             raise CommandError(f"Unsupported format: {file_format}")
 
@@ -76,7 +115,21 @@ class Command(BaseCommand):
         for file_path in files_to_import:
             self.stdout.write(f"  {file_path.name}...")
             games = parser.parse(file_path)
-            total_processed += repo.save_batch(games, batch_size=batch_size)
+            if use_copy:
+                total_processed += repo.save_bulk_copy(
+                    games, batch_size=batch_size, update_existing=update_existing
+                )
+            elif writer_threads > 0:
+                total_processed += repo.save_stream(
+                    games,
+                    batch_size=batch_size,
+                    workers=writer_threads,
+                    update_existing=update_existing,
+                )
+            else:
+                total_processed += repo.save_batch(
+                    games, batch_size=batch_size, update_existing=update_existing
+                )
 
         elapsed = time.time() - start_time
         final_count = repo.count()
@@ -91,15 +144,17 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"New games added: {new_games}"))
         self.stdout.write(self.style.SUCCESS(f"Total games in database: {final_count}"))
 
-    def _get_parser(self, file_format: str):
+    def _get_parser(self, file_format: str, workers: int = 1, validate: bool = True):
         """Get the appropriate parser for the file format.
 
         Args:
             file_format: The format string (e.g., "pgn").
+            workers: Number of parsing processes.
+            validate: Replay moves to validate and canonicalize them.
 
         Returns:
             A parser instance or None if format is unsupported.
         """
         if file_format == "pgn":
-            return PGNParser()
+            return PGNParser(workers=workers, validate=validate)
         return None
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-16 00:52
+
+from django.db import migrations, models
+
+import chess_core.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chess_core", "0007_add_endgame_move_ply_and_endgame_fen"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="date_week",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=chess_core.models.DateBucket("date", "week"),
+                output_field=models.DateField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="date_month",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=chess_core.models.DateBucket("date", "month"),
+                output_field=models.DateField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="date_year",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=chess_core.models.DateBucket("date", "year"),
+                output_field=models.DateField(),
+            ),
+        ),
+    ]
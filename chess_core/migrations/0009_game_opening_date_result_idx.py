@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-16 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chess_core", "0008_game_date_period_buckets"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                fields=["opening", "date"],
+                include=["result", "move_count_ply"],
+                name="game_opening_date_result_idx",
+            ),
+        ),
+    ]
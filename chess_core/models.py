@@ -30,6 +30,47 @@ class Opening(models.Model):
         return f"{self.eco_code}: {self.name}"
 
 
+# SQLite DATE() modifiers that move a date to the start of its period.
+_SQLITE_BUCKET_MODIFIERS = {
+    "week": "'-6 days', 'weekday 1'",
+    "month": "'start of month'",
+    "year": "'start of year'",
+}
+
+
+class DateBucket(models.Func):
+    """First day of the week (Monday), month or year containing a date.
+
+    Emitted as immutable SQL so it can back a generated column; Django's
+    Trunc compiles to DATE_TRUNC on timestamptz in PostgreSQL, which is
+    not immutable.
+    """
+
+    output_field = models.DateField()
+
+    def __init__(self, expression, kind: str, **extra) -> None:
+        """Initialize the bucket expression.
+
+        Args:
+            expression: Date column or expression to bucket.
+            kind: "week", "month" or "year".
+        """
+        if kind not in _SQLITE_BUCKET_MODIFIERS:
+            raise ValueError(f"Unsupported date bucket: {kind!r}")
+        self.kind = kind
+        super().__init__(expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        """Compile to DATE_TRUNC on a plain timestamp (PostgreSQL)."""
+        template = f"(DATE_TRUNC('{self.kind}', %(expressions)s::timestamp))::date"
+        return super().as_sql(compiler, connection, template=template, **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        """Compile to SQLite's DATE() with start-of-period modifiers."""
+        template = f"DATE(%(expressions)s, {_SQLITE_BUCKET_MODIFIERS[self.kind]})"
+        return super().as_sql(compiler, connection, template=template, **extra_context)
+
+
 class Game(models.Model):
     """Represents a chess game with metadata and moves."""
 
@@ -55,11 +96,37 @@ class Game(models.Model):
     opening = models.ForeignKey(
         Opening, null=True, blank=True, on_delete=models.SET_NULL, db_index=True
     )
+    # Period buckets of date, stored and indexed for win-rate-over-time.
+    date_week = models.GeneratedField(
+        expression=DateBucket("date", "week"),
+        output_field=models.DateField(),
+        db_persist=True,
+        db_index=True,
+    )
+    date_month = models.GeneratedField(
+        expression=DateBucket("date", "month"),
+        output_field=models.DateField(),
+        db_persist=True,
+        db_index=True,
+    )
+    date_year = models.GeneratedField(
+        expression=DateBucket("date", "year"),
+        output_field=models.DateField(),
+        db_persist=True,
+        db_index=True,
+    )
 
     class Meta:
         db_table = "game"
         indexes = [
             models.Index(fields=["event"]),
+            # Covers the per-opening stats and chart aggregations so
+            # PostgreSQL can answer them with an index-only scan.
+            models.Index(
+                fields=["opening", "date"],
+                include=["result", "move_count_ply"],
+                name="game_opening_date_result_idx",
+            ),
         ]
 
     def __str__(self) -> str:
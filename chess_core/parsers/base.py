@@ -11,13 +11,14 @@ from pathlib import Path
 from typing import Iterator, Protocol
 
 
-@dataclass
+@dataclass(slots=True)
 class GameData:
     """Framework-agnostic game representation.
 
     This dataclass serves as a data transfer object between parsers and
     repositories. It contains all the information needed to represent
-    a chess game without any framework-specific dependencies.
+    a chess game without any framework-specific dependencies. It uses
+    __slots__ so large imports don't pay for a per-instance __dict__.
 
     Attributes:
         source_id: Unique identifier for the game (typically a hash).
@@ -34,7 +35,8 @@ class GameData:
         termination: How the game ended (e.g., "won by resignation").
         moves: The move text in standard notation.
         source_format: Format the game was parsed from (e.g., "pgn").
-        raw_headers: All original headers preserved as key-value pairs.
+        raw_headers: Original headers not stored in another field, as
+            key-value pairs.
         opening_fen: FEN of the detected opening position (for FK lookup).
     """
 
@@ -6,15 +6,121 @@ the standard format for recording chess games.
 
 from __future__ import annotations
 
+import bz2
+import functools
+import gzip
 import hashlib
+import io
+import mmap
+import pickle
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import date
 from pathlib import Path
-from typing import Iterator
+from typing import IO, Callable, Iterator, Mapping
 
 import chess.pgn
 
 from .base import GameData
 
+# Shared source_format value for every game this parser produces.
+SOURCE_FORMAT = "pgn"
+
+# Headers that identify a game for source_id, in digest order. EndTime keeps
+# same-round games apart. Changing this changes every stored source_id.
+_SOURCE_ID_HEADERS = (
+    "Event",
+    "Site",
+    "Date",
+    "Round",
+    "White",
+    "Black",
+    "Result",
+    "EndTime",
+)
+
+# Headers stored verbatim in their own GameData fields, so raw_headers omits
+# them. Date and the Elo tags are parsed lossily and stay in raw_headers.
+_EXTRACTED_HEADERS = frozenset(
+    {
+        "Event",
+        "Site",
+        "Round",
+        "White",
+        "Black",
+        "Result",
+        "TimeControl",
+        "Termination",
+    }
+)
+
+# Read PGN files in large chunks so bulk imports issue few read() syscalls.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Compressed PGN dumps (e.g. from lichess) are decompressed while reading.
+_OPENERS = {".bz2": bz2.open, ".gz": gzip.open}
+
+# Games are split for parallel parsing at each line starting an Event tag.
+_GAME_BOUNDARY = b"\n[Event "
+
+# Target size of the byte range each worker task parses; ranges end at the
+# first game boundary past this size.
+SLICE_BYTES = 4 << 20
+
+# Slices submitted ahead of the one being yielded, per worker. Bounds how
+# many parsed slices wait in memory while the consumer is busy writing.
+SLICES_IN_FLIGHT_PER_WORKER = 2
+
+# Matches header values that int() accepts, so unrated "?" Elo tags are
+# rejected without raising ValueError.
+_INT_RE = re.compile(r"[+-]?\d+", re.ASCII)
+
+# PGN dates are YYYY.MM.DD with unknown parts written as "????" or "??".
+_DATE_RE = re.compile(r"(\d{1,4}|\?{4})\.(\d{1,2}|\?{2})\.(\d{1,2}|\?{2})", re.ASCII)
+
+# Tag pair lines, e.g. [White "Carlsen, Magnus"]; values may escape \" and \\.
+_TAG_RE = re.compile(r'\[([A-Za-z0-9][A-Za-z0-9_+#=:-]*)\s+"((?:[^"\\]|\\.)*)"\]')
+_TAG_ESCAPE_RE = re.compile(r"\\(.)")
+
+# Movetext that carries no moves: brace and rest-of-line comments.
+_COMMENT_RE = re.compile(r"\{[^}]*\}|;[^\n]*")
+
+# Innermost variation; stripped repeatedly so nested variations go too.
+_VARIATION_RE = re.compile(r"\([^()]*\)")
+
+# Move numbers (also when glued to the move, as in "1.e4"), NAGs and
+# annotation glyphs.
+_MOVETEXT_NOISE_RE = re.compile(r"\d+\.+|\$\d+|[?!]+")
+
+_RESULTS = frozenset({"1-0", "0-1", "1/2-1/2", "*"})
+
+# Distinct Date/Elo header values cached by the parse helpers; archives repeat
+# the same values across many games.
+PARSE_CACHE_SIZE = 8192
+
+
+# Returned by _FilteringGameBuilder for games rejected by the header filter.
+_REJECTED = object()
+
+
+class _FilteringGameBuilder(chess.pgn.GameBuilder):
+    """GameBuilder that skips the moves of games rejected by a header filter."""
+
+    def __init__(self, header_filter: Callable[[Mapping[str, str]], bool]) -> None:
+        super().__init__()
+        self._header_filter = header_filter
+        self._rejected = False
+
+    def end_headers(self):
+        if not self._header_filter(self.game.headers):
+            self._rejected = True
+            return chess.pgn.SKIP
+        return None
+
+    def result(self):
+        return _REJECTED if self._rejected else super().result()
+
 
 class PGNParser:
     """Parser for PGN (Portable Game Notation) files.
@@ -28,28 +134,148 @@ class PGNParser:
         ...     print(f"{game.white_player} vs {game.black_player}: {game.result}")
     """
 
-    def __init__(self) -> None:
-        """Initialize the parser."""
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+        header_filter: Callable[[Mapping[str, str]], bool] | None = None,
+        capture_raw: bool = True,
+        validate: bool = True,
+    ) -> None:
+        """Initialize the parser.
 
-    def parse(self, source: Path | str) -> Iterator[GameData]:
+        Args:
+            chunk_size: Size in bytes of the read buffer used when opening
+                PGN files (default: 1 MiB).
+            workers: Number of processes used to parse a file. With more
+                than one, games are split at Event tags and parsed in a
+                process pool; output order is preserved (default: 1).
+            header_filter: Optional predicate called with each game's
+                headers; games it rejects are skipped without parsing their
+                moves. Must be picklable (e.g. a module-level function, not
+                a lambda) when workers > 1.
+            capture_raw: Keep headers that have no GameData field of their
+                own in GameData.raw_headers. When False, raw_headers is left
+                empty.
+            validate: Replay every game with python-chess, which rejects
+                illegal moves and rewrites SAN in canonical form. When
+                False, games are split with a lightweight line scanner and
+                moves are stored as written, minus comments, variations
+                and NAGs; much faster for trusted sources such as lichess
+                dumps that already write canonical SAN.
+
+        Raises:
+            ValueError: If workers > 1 and header_filter cannot be pickled.
+        """
+        if workers > 1 and header_filter is not None:
+            try:
+                pickle.dumps(header_filter)
+            except (pickle.PicklingError, AttributeError, TypeError) as exc:
+                raise ValueError(
+                    "header_filter must be picklable when workers > 1"
+                ) from exc
+        self._chunk_size = chunk_size
+        self._workers = workers
+        self._header_filter = header_filter
+        self._capture_raw = capture_raw
+        self._validate = validate
+
+    def parse(self, source: Path | str | IO[str]) -> Iterator[GameData]:
         """Parse games from a PGN file.
 
+        Files ending in .bz2 or .gz are decompressed on the fly.
+
         Args:
-            source: Path to the PGN file.
+            source: Path to the PGN file, or an open text stream.
 
         Yields:
             GameData objects for each game in the file.
         """
+        if hasattr(source, "read"):
+            yield from self.parse_stream(source)
+            return
+
         path = Path(source)
-        with open(path, encoding="utf-8", errors="replace") as pgn_file:
-            while True:
-                game = chess.pgn.read_game(pgn_file)
-                if game is None:
-                    break
+        opener = _OPENERS.get(path.suffix)
+        if opener is not None:
+            with opener(path, "rt", encoding="utf-8", errors="replace") as pgn_file:
+                yield from self.parse_stream(pgn_file)
+            return
+
+        if self._workers > 1:
+            yield from self._parse_parallel(path)
+            return
+
+        with open(
+            path, encoding="utf-8", errors="replace", buffering=self._chunk_size
+        ) as pgn_file:
+            yield from self.parse_stream(pgn_file)
+
+    def parse_stream(self, stream: IO[str]) -> Iterator[GameData]:
+        """Parse games from an open text stream.
+
+        Args:
+            stream: A file-like object yielding PGN text.
+
+        Yields:
+            GameData objects for each game in the stream.
+        """
+        if not self._validate:
+            yield from self._scan_stream(stream)
+            return
+
+        builder = (
+            functools.partial(_FilteringGameBuilder, self._header_filter)
+            if self._header_filter is not None
+            else chess.pgn.GameBuilder
+        )
+        while True:
+            game = chess.pgn.read_game(stream, Visitor=builder)
+            if game is None:
+                break
+            if game is _REJECTED:
+                continue
+
+            game_data = self._convert_game(game)
+            if game_data is not None:
+                yield game_data
 
-                game_data = self._convert_game(game)
-                if game_data is not None:
-                    yield game_data
+    def _scan_stream(self, stream: IO[str]) -> Iterator[GameData]:
+        """Parse games from a stream without replaying their moves.
+
+        Args:
+            stream: A file-like object yielding PGN text.
+
+        Yields:
+            GameData objects for each game in the stream.
+        """
+        for headers, movetext in _scan_games(stream):
+            if self._header_filter is not None and not self._header_filter(headers):
+                continue
+            yield self._build_game_data(headers, _clean_movetext(headers, movetext))
+
+    def _parse_parallel(self, path: Path) -> Iterator[GameData]:
+        """Parse a PGN file across a pool of worker processes.
+
+        Slices are submitted a few at a time rather than all up front, so
+        only a bounded number of parsed slices is held in memory while the
+        consumer falls behind.
+
+        Args:
+            path: Path to the PGN file.
+
+        Yields:
+            GameData objects in file order.
+        """
+        window = self._workers * SLICES_IN_FLIGHT_PER_WORKER
+        pending: deque[Future[list[GameData]]] = deque()
+        with ProcessPoolExecutor(max_workers=self._workers) as pool:
+            for byte_range in _game_ranges(path, SLICE_BYTES):
+                pending.append(pool.submit(_parse_slice, self, path, byte_range))
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
 
     def _convert_game(self, game: chess.pgn.Game) -> GameData | None:
         """Convert a python-chess Game to a GameData object.
@@ -60,8 +286,18 @@ class PGNParser:
         Returns:
             A GameData object, or None if the game is invalid.
         """
-        headers = game.headers
+        return self._build_game_data(game.headers, self._get_moves_text(game))
+
+    def _build_game_data(self, headers: Mapping[str, str], moves: str) -> GameData:
+        """Build a GameData object from a game's headers and move text.
+
+        Args:
+            headers: The PGN headers.
+            moves: The moves as a string in standard algebraic notation.
 
+        Returns:
+            The GameData object for the game.
+        """
         # Extract required fields
         white_player = headers.get("White", "Unknown")
         black_player = headers.get("Black", "Unknown")
@@ -77,11 +313,16 @@ class PGNParser:
         white_elo = self._parse_int(headers.get("WhiteElo"))
         black_elo = self._parse_int(headers.get("BlackElo"))
 
-        # Get move text (without clock annotations for cleaner storage)
-        moves = self._get_moves_text(game)
-
-        # Collect all raw headers
-        raw_headers = dict(headers)
+        # Keep only headers that no GameData field already holds
+        raw_headers = (
+            {
+                name: value
+                for name, value in headers.items()
+                if name not in _EXTRACTED_HEADERS
+            }
+            if self._capture_raw
+            else {}
+        )
 
         return GameData(
             source_id=source_id,
@@ -97,34 +338,27 @@ class PGNParser:
             time_control=headers.get("TimeControl"),
             termination=headers.get("Termination"),
             moves=moves,
-            source_format="pgn",
+            source_format=SOURCE_FORMAT,
             raw_headers=raw_headers,
             opening_fen="",
         )
 
-    def _generate_source_id(self, headers: chess.pgn.Headers) -> str:
+    def _generate_source_id(self, headers: Mapping[str, str]) -> str:
         """Generate a unique ID for a game based on its headers.
 
+        The digest must stay stable across releases: re-imports rely on it
+        to skip games that are already stored.
+
         Args:
             headers: The PGN headers.
 
         Returns:
-            A SHA-256 hash of key identifying information.
+            A SHA-256 hex digest (64 chars) of key identifying information.
         """
-        # Use key headers that should uniquely identify a game
-        key_parts = [
-            headers.get("Event", ""),
-            headers.get("Site", ""),
-            headers.get("Date", ""),
-            headers.get("Round", ""),
-            headers.get("White", ""),
-            headers.get("Black", ""),
-            headers.get("Result", ""),
-            # Include end time if available for uniqueness in same-round games
-            headers.get("EndTime", ""),
-        ]
-        key_string = "|".join(key_parts)
-        return hashlib.sha256(key_string.encode()).hexdigest()[:64]
+        # A list comprehension lets join size the result in one pass, unlike a
+        # generator it would first have to materialise.
+        key_string = "|".join([headers.get(name, "") for name in _SOURCE_ID_HEADERS])
+        return hashlib.sha256(key_string.encode()).hexdigest()
 
     def _parse_date(self, date_str: str) -> date | None:
         """Parse a PGN date string to a Python date.
@@ -138,27 +372,7 @@ class PGNParser:
         Returns:
             A date object if parseable, None otherwise.
         """
-        if not date_str or "?" in date_str:
-            # Try to parse partial dates
-            parts = date_str.split(".")
-            if len(parts) == 3:
-                try:
-                    year = int(parts[0]) if parts[0] != "????" else None
-                    month = int(parts[1]) if parts[1] != "??" else 1
-                    day = int(parts[2]) if parts[2] != "??" else 1
-                    if year:
-                        return date(year, month, day)
-                except (ValueError, TypeError):
-                    pass
-            return None
-
-        try:
-            parts = date_str.split(".")
-            if len(parts) == 3:
-                return date(int(parts[0]), int(parts[1]), int(parts[2]))
-        except (ValueError, IndexError):
-            pass
-        return None
+        return _parse_date(date_str)
 
     def _parse_int(self, value: str | None) -> int | None:
         """Safely parse a string to an integer.
@@ -169,12 +383,7 @@ class PGNParser:
         Returns:
             Integer value or None if parsing fails.
         """
-        if not value or value == "?" or value == "-":
-            return None
-        try:
-            return int(value)
-        except ValueError:
-            return None
+        return _parse_int(value)
 
     def _get_moves_text(self, game: chess.pgn.Game) -> str:
         """Extract the move text from a game.
@@ -185,8 +394,226 @@ class PGNParser:
         Returns:
             The moves as a string in standard algebraic notation.
         """
-        # Use the exporter to get clean move text
-        exporter = chess.pgn.StringExporter(
-            headers=False, variations=False, comments=False
+        # Walk the mainline directly instead of through StringExporter, which
+        # adds visitor dispatch and 80-column wrapping per game. read_game has
+        # already resolved every SAN token, and regenerating SAN yields the
+        # canonical spelling (O-O, minimal disambiguation, check marks)
+        # regardless of how the source file wrote it, which stored games and
+        # opening detection depend on.
+        board = game.board()
+        tokens: list[str] = []
+        for move in game.mainline_moves():
+            if board.turn == chess.WHITE:
+                tokens.append(f"{board.fullmove_number}.")
+            elif not tokens:
+                tokens.append(f"{board.fullmove_number}...")
+            tokens.append(board.san_and_push(move))
+        tokens.append(game.headers.get("Result", "*"))
+        return " ".join(tokens)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_date(date_str: str) -> date | None:
+    """Parse a PGN date string, caching results per distinct value.
+
+    Args:
+        date_str: The date string from PGN headers.
+
+    Returns:
+        A date object if parseable, None otherwise.
+    """
+    match = _DATE_RE.fullmatch(date_str) if date_str else None
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    if year == "????":
+        return None
+    try:
+        return date(
+            int(year),
+            int(month) if month != "??" else 1,
+            int(day) if day != "??" else 1,
         )
-        return game.accept(exporter).strip()
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_int(value: str | None) -> int | None:
+    """Parse an integer header value, caching results per distinct value.
+
+    Args:
+        value: String to parse.
+
+    Returns:
+        Integer value or None if parsing fails.
+    """
+    if not value or _INT_RE.fullmatch(value) is None:
+        return None
+    return int(value)
+
+
+def _game_ranges(path: Path, slice_bytes: int) -> list[tuple[int, int]]:
+    """Split a PGN file into byte ranges that start at game boundaries.
+
+    Only one boundary is searched for per range, so indexing cost grows with
+    the number of ranges rather than the number of games.
+
+    Args:
+        path: Path to the PGN file.
+        slice_bytes: Minimum size of each range except the last.
+
+    Returns:
+        (start, end) byte offsets covering the whole file.
+    """
+    with open(path, "rb") as pgn_file:
+        size = pgn_file.seek(0, io.SEEK_END)
+        if size == 0:
+            return []
+        with mmap.mmap(pgn_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            starts = [0]
+            pos = data.find(_GAME_BOUNDARY, slice_bytes - 1)
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = data.find(_GAME_BOUNDARY, pos + slice_bytes)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _parse_slice(
+    parser: PGNParser, path: Path, byte_range: tuple[int, int]
+) -> list[GameData]:
+    """Parse the games in one byte range of a PGN file.
+
+    Runs in a worker process, so it takes plain picklable arguments.
+
+    Args:
+        parser: The parser whose options apply to the slice.
+        path: Path to the PGN file.
+        byte_range: (start, end) byte offsets of the slice.
+
+    Returns:
+        The GameData objects found in the slice.
+    """
+    start, end = byte_range
+    with open(path, "rb") as pgn_file:
+        pgn_file.seek(start)
+        text = pgn_file.read(end - start).decode("utf-8", errors="replace")
+
+    return list(parser.parse_stream(io.StringIO(text)))
+
+
+def _scan_games(stream: IO[str]) -> Iterator[tuple[dict[str, str], str]]:
+    """Split a PGN stream into games without parsing their moves.
+
+    A game's tag pairs run until the first blank or non-tag line; its
+    movetext runs until the next blank line or tag pair. Lines inside a
+    brace comment always belong to the movetext, even when they are
+    blank or start with "[" (e.g. a wrapped "[%clk 0:01:00]}").
+
+    Args:
+        stream: A file-like object yielding PGN text.
+
+    Yields:
+        (headers, movetext) for each game in the stream.
+    """
+    headers: dict[str, str] = {}
+    movetext: list[str] = []
+    in_movetext = False
+    in_comment = False
+    for line in stream:
+        if in_comment:
+            movetext.append(line)
+            in_comment = _ends_in_comment(line, in_comment=True)
+            continue
+        if line.startswith("%"):
+            continue
+        if line.startswith("["):
+            if in_movetext:
+                yield headers, "".join(movetext)
+                headers, movetext, in_movetext = {}, [], False
+            match = _TAG_RE.match(line)
+            if match is not None:
+                headers[match[1]] = _TAG_ESCAPE_RE.sub(r"\1", match[2])
+        elif line.strip():
+            movetext.append(line)
+            in_movetext = True
+            in_comment = _ends_in_comment(line, in_comment=False)
+        elif movetext:
+            yield headers, "".join(movetext)
+            headers, movetext, in_movetext = {}, [], False
+        elif headers:
+            in_movetext = True
+    if headers or movetext:
+        yield headers, "".join(movetext)
+
+
+def _ends_in_comment(line: str, in_comment: bool) -> bool:
+    """Return whether a brace comment is still open at the end of a line.
+
+    Braces inside a rest-of-line (";") comment are ignored, as are
+    opening braces inside a brace comment; PGN comments do not nest.
+
+    Args:
+        line: A movetext line.
+        in_comment: Whether a brace comment was open before the line.
+
+    Returns:
+        True if the line leaves a brace comment open.
+    """
+    pos = 0
+    while True:
+        if in_comment:
+            end = line.find("}", pos)
+            if end == -1:
+                return True
+            in_comment, pos = False, end + 1
+        else:
+            start = line.find("{", pos)
+            if start == -1 or line.find(";", pos, start) != -1:
+                return False
+            in_comment, pos = True, start + 1
+
+
+def _clean_movetext(headers: Mapping[str, str], movetext: str) -> str:
+    """Reduce raw movetext to the layout _get_moves_text produces.
+
+    Comments, variations, NAGs and move numbers are dropped, and move
+    numbers are regenerated from the starting position.
+
+    Args:
+        headers: The game's PGN headers; a FEN tag sets the starting move.
+        movetext: The raw movetext of the game.
+
+    Returns:
+        The mainline moves, e.g. "1. e4 e5 2. Nf3 1-0".
+    """
+    text = _COMMENT_RE.sub(" ", movetext)
+    while True:
+        text, count = _VARIATION_RE.subn(" ", text)
+        if not count:
+            break
+    text = _MOVETEXT_NOISE_RE.sub(" ", text)
+
+    white_to_move, move_number = True, 1
+    fen = headers.get("FEN")
+    if fen:
+        fields = fen.split()
+        if len(fields) >= 6 and fields[5].isdigit():
+            white_to_move, move_number = fields[1] != "b", int(fields[5])
+
+    tokens: list[str] = []
+    for san in text.split():
+        if san in _RESULTS:
+            continue
+        if san.startswith("0-0"):
+            san = san.replace("0", "O")
+        if white_to_move:
+            tokens.append(f"{move_number}.")
+        else:
+            if not tokens:
+                tokens.append(f"{move_number}...")
+            move_number += 1
+        tokens.append(san)
+        white_to_move = not white_to_move
+    tokens.append(headers.get("Result", "*"))
+    return " ".join(tokens)
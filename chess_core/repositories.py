@@ -4,12 +4,50 @@ This module provides the GameRepository class which bridges the gap between
 framework-agnostic GameData objects and Django ORM models.
 """
 
-from collections.abc import Iterable
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from functools import cached_property
 from typing import Any
 
-from .models import Game, Opening
+from django.conf import settings
+from django.db import connection, reset_queries, transaction
+
+from .models import Game
 from .parsers.base import GameData
-from .services import EndgameDetector, OpeningDetector
+from .services import OpeningDetector, analyze_game, opening_fen_to_id
+from .services.move_parsing import count_plies
+
+# Parsed batches save_stream buffers ahead of its database threads.
+STREAM_QUEUE_SIZE = 8
+
+# Columns overwritten when save_batch upserts games that already exist.
+UPSERT_FIELDS = (
+    "event",
+    "site",
+    "date",
+    "round",
+    "white_player",
+    "black_player",
+    "result",
+    "white_elo",
+    "black_elo",
+    "time_control",
+    "termination",
+    "moves",
+    "move_count_ply",
+    "source_format",
+    "raw_headers",
+    "opening",
+    "endgame_move_ply",
+    "endgame_fen",
+)
+
+# Model fields written by save_bulk_copy, in COPY column order.
+COPY_FIELDS = tuple(
+    Game._meta.get_field(name) for name in ("source_id", *UPSERT_FIELDS)
+)
 
 
 class GameRepository:
@@ -25,15 +63,19 @@ class GameRepository:
         >>> print(f"Imported {count} games")
     """
 
-    def __init__(self) -> None:
-        """Initialize the repository with opening FEN cache."""
-        # Pre-load FEN → Opening ID mapping for efficient bulk inserts
-        self._opening_cache: dict[str, int] = dict(
-            Opening.objects.values_list("fen", "id")
-        )
-        self._opening_detector = OpeningDetector(
-            fen_set=set(self._opening_cache.keys())
-        )
+    @cached_property
+    def _opening_cache(self) -> dict[str, int]:
+        """FEN → Opening ID mapping used to link games to openings.
+
+        Loaded on first use, so repositories that only update existing
+        games never query the Opening table.
+        """
+        return opening_fen_to_id()
+
+    @cached_property
+    def _opening_detector(self) -> OpeningDetector:
+        """Detector over the FENs of _opening_cache."""
+        return OpeningDetector(fen_set=self._opening_cache.keys())
 
     def save(self, game_data: GameData) -> Game:
         """Save a single game, updating if source_id exists.
@@ -54,40 +96,219 @@ class GameRepository:
         self,
         games: Iterable[GameData],
         batch_size: int = 1000,
+        update_existing: bool = False,
     ) -> int:
         """Bulk insert games, skipping duplicates.
 
-        Uses Django's bulk_create with ignore_conflicts for efficient
-        batch insertion. Existing games (by source_id) are skipped.
+        Games are collected into batches; for each batch the source_ids
+        already in the database are fetched with a single query and those
+        games are skipped before any opening/endgame detection runs. The
+        rest are written with bulk_create (ignore_conflicts guards against
+        concurrent inserts and repeats within the batch).
+
+        With update_existing, each batch is instead written as a single
+        upsert (INSERT ... ON CONFLICT (source_id) DO UPDATE) so stored
+        games are refreshed from the new data.
 
         Args:
             games: Iterable of GameData objects to save.
             batch_size: Number of games to insert per batch.
+            update_existing: Overwrite games whose source_id already exists
+                instead of skipping them.
 
         Returns:
             The total number of games processed.
         """
-        batch: list[Game] = []
+        batch: list[GameData] = []
         total_processed = 0
 
         for game_data in games:
-            model = Game(
-                source_id=game_data.source_id,
-                **self._to_model_fields(game_data),
-            )
-            batch.append(model)
+            batch.append(game_data)
             total_processed += 1
 
             if len(batch) >= batch_size:
-                self._flush_batch(batch)
-                batch = []
+                self._flush_batch(batch, update_existing)
+                _clear_debug_query_log()
+                batch.clear()
 
         # Flush remaining games
         if batch:
-            self._flush_batch(batch)
+            self._flush_batch(batch, update_existing)
+            _clear_debug_query_log()
+
+        return total_processed
+
+    def save_stream(
+        self,
+        games: Iterable[GameData],
+        batch_size: int = 1000,
+        workers: int = 1,
+        update_existing: bool = False,
+    ) -> int:
+        """Bulk insert games, flushing batches on background threads.
+
+        The calling thread drains the games iterable (usually a parser)
+        into batches and hands them to worker threads through a bounded
+        queue, so parsing overlaps with database writes. Each worker uses
+        its own database connection and closes it when done. Batches are
+        written exactly as save_batch writes them. Once a batch fails, the
+        games iterable is no longer read and the error is raised as soon as
+        the workers stop.
+
+        More than one worker needs a database that accepts concurrent
+        writers such as PostgreSQL; SQLite locks the table and fails with
+        "database table is locked".
+
+        Args:
+            games: Iterable of GameData objects to save.
+            batch_size: Number of games to insert per batch.
+            workers: Number of database threads.
+            update_existing: Overwrite games whose source_id already exists
+                instead of skipping them.
 
+        Returns:
+            The total number of games processed.
+
+        Raises:
+            Exception: The first error raised while writing a batch.
+        """
+        batches: queue.Queue[list[GameData] | None] = queue.Queue(
+            maxsize=STREAM_QUEUE_SIZE
+        )
+        errors: list[Exception] = []
+
+        def consume() -> None:
+            try:
+                while (batch := batches.get()) is not None:
+                    # Keep draining after a failure so the producer never blocks.
+                    if errors:
+                        continue
+                    try:
+                        self._flush_batch(batch, update_existing)
+                    # Any error is handed to the caller thread and re-raised.
+                    except Exception as exc:  # noqa: BLE001
+                        errors.append(exc)
+                    _clear_debug_query_log()
+            finally:
+                connection.close()
+
+        # Load openings on this thread, once, before the workers need them.
+        self._opening_detector  # noqa: B018
+
+        threads = [threading.Thread(target=consume) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        batch: list[GameData] = []
+        total_processed = 0
+        try:
+            for game_data in games:
+                batch.append(game_data)
+                total_processed += 1
+
+                if len(batch) >= batch_size:
+                    # Stop reading the input once a worker has failed.
+                    if errors:
+                        break
+                    batches.put(batch)
+                    batch = []
+
+            if batch and not errors:
+                batches.put(batch)
+        finally:
+            for _ in threads:
+                batches.put(None)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
         return total_processed
 
+    def save_bulk_copy(
+        self,
+        games: Iterable[GameData],
+        batch_size: int = 10000,
+        update_existing: bool = False,
+    ) -> int:
+        """Bulk save games through PostgreSQL COPY.
+
+        Each batch is streamed with COPY into a temporary staging table and
+        then merged with INSERT ... SELECT ... ON CONFLICT (source_id),
+        bypassing per-row parameter binding. On other database backends
+        this falls back to save_batch.
+
+        Args:
+            games: Iterable of GameData objects to save.
+            batch_size: Number of games to stage per COPY.
+            update_existing: Overwrite games whose source_id already exists
+                (DO UPDATE) instead of skipping them (DO NOTHING), as in
+                save_batch (default: False).
+
+        Returns:
+            The total number of games processed.
+        """
+        if connection.vendor != "postgresql":
+            return self.save_batch(
+                games, batch_size=batch_size, update_existing=update_existing
+            )
+
+        batch: list[GameData] = []
+        total_processed = 0
+
+        for game_data in games:
+            batch.append(game_data)
+            total_processed += 1
+
+            if len(batch) >= batch_size:
+                self._copy_batch(batch, update_existing)
+                _clear_debug_query_log()
+                batch.clear()
+
+        if batch:
+            self._copy_batch(batch, update_existing)
+            _clear_debug_query_log()
+
+        return total_processed
+
+    def update_field(self, values: dict[int, Any], field_name: str) -> int:
+        """Set one column on many games by primary key.
+
+        On PostgreSQL the new values are joined in as unnest()ed arrays in a
+        single UPDATE ... FROM, rather than the CASE WHEN chain bulk_update
+        builds. Other database backends fall back to bulk_update.
+
+        Args:
+            values: Mapping of game id to the new value for field_name.
+            field_name: Name of the Game field to set.
+
+        Returns:
+            The number of games updated.
+        """
+        if not values:
+            return 0
+
+        field = Game._meta.get_field(field_name)
+        if connection.vendor != "postgresql":
+            games = [
+                Game(pk=game_id, **{field.attname: value})
+                for game_id, value in values.items()
+            ]
+            return Game.objects.bulk_update(games, [field_name])
+
+        qn = connection.ops.quote_name
+        table = qn(Game._meta.db_table)
+        pk = Game._meta.pk
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET {qn(field.column)} = v.value "
+                f"FROM unnest(%s::{pk.db_type(connection)}[], "
+                f"%s::{field.db_type(connection)}[]) AS v(id, value) "
+                f"WHERE {table}.{qn(pk.column)} = v.id",
+                [list(values), list(values.values())],
+            )
+            return cursor.rowcount
+
     def exists(self, source_id: str) -> bool:
         """Check if a game with the given source_id exists.
 
@@ -116,11 +337,12 @@ class GameRepository:
         Returns:
             Dictionary of field names to values for the Game model.
         """
-        # Detect opening from moves and resolve FEN to Opening ID
-        match = self._opening_detector.detect_opening(game_data.moves)
+        # Detect opening and endgame in one replay; resolve FEN to Opening ID
+        analysis = analyze_game(game_data.moves, self._opening_detector)
+        match = analysis.opening
         opening_id = self._opening_cache.get(match.fen) if match else None
 
-        endgame_entry = EndgameDetector().detect_endgame(game_data.moves)
+        endgame_entry = analysis.endgame
         if endgame_entry is not None:
             endgame_move_ply = endgame_entry.ply
             endgame_fen = (
@@ -145,7 +367,7 @@ class GameRepository:
             "time_control": game_data.time_control or "",
             "termination": game_data.termination or "",
             "moves": game_data.moves,
-            "move_count_ply": self._count_moves(game_data.moves),
+            "move_count_ply": count_plies(game_data.moves),
             "source_format": game_data.source_format,
             "raw_headers": game_data.raw_headers,
             "opening_id": opening_id,
@@ -153,36 +375,123 @@ class GameRepository:
             "endgame_fen": endgame_fen,
         }
 
-    def _count_moves(self, moves: str) -> int | None:
-        """Count the number of half-moves (ply) in a move string.
+    def _flush_batch(
+        self, batch: list[GameData], update_existing: bool = False
+    ) -> None:
+        """Write a batch of games to the database.
 
         Args:
-            moves: A move string in SAN format, e.g., "1. e4 e5 2. Nf3 Nc6".
-
-        Returns:
-            The number of half-moves (ply), or None if moves is empty.
+            batch: List of GameData objects to save.
+            update_existing: Upsert games that already exist instead of
+                skipping them.
         """
-        if not moves:
-            return None
+        with _batch_transaction():
+            if update_existing:
+                self._upsert_batch(batch)
+                return
+
+            existing = set(
+                Game.objects.filter(
+                    source_id__in=[game_data.source_id for game_data in batch]
+                ).values_list("source_id", flat=True)
+            )
+            models = [
+                Game(source_id=game_data.source_id, **self._to_model_fields(game_data))
+                for game_data in batch
+                if game_data.source_id not in existing
+            ]
+            if models:
+                Game.objects.bulk_create(models, ignore_conflicts=True)
 
-        tokens = moves.split()
-        move_count = 0
+    def _upsert_batch(self, batch: list[GameData]) -> None:
+        """Insert or update a batch of games in one statement.
 
-        for token in tokens:
-            # Skip move numbers (e.g., "1.", "2.", "1...")
-            if token.endswith(".") or token.replace(".", "").isdigit():
-                continue
-            # Skip result markers
-            if token in ("1-0", "0-1", "1/2-1/2", "*"):
-                continue
-            move_count += 1
+        A row may only be touched once per upsert statement, so repeated
+        source_ids within the batch are collapsed to their last occurrence.
 
-        return move_count if move_count > 0 else None
+        Args:
+            batch: List of GameData objects to save.
+        """
+        latest = {game_data.source_id: game_data for game_data in batch}
+        models = [
+            Game(source_id=source_id, **self._to_model_fields(game_data))
+            for source_id, game_data in latest.items()
+        ]
+        Game.objects.bulk_create(
+            models,
+            update_conflicts=True,
+            unique_fields=["source_id"],
+            update_fields=list(UPSERT_FIELDS),
+        )
 
-    def _flush_batch(self, batch: list[Game]) -> None:
-        """Write a batch of games to the database.
+    def _copy_batch(self, batch: list[GameData], update_existing: bool) -> None:
+        """Save a batch of games via COPY into a staging table.
 
         Args:
-            batch: List of Game model instances to save.
+            batch: List of GameData objects to save.
+            update_existing: Overwrite existing games instead of skipping
+                them.
         """
-        Game.objects.bulk_create(batch, ignore_conflicts=True)
+        qn = connection.ops.quote_name
+        table = qn(Game._meta.db_table)
+        columns = ", ".join(qn(field.column) for field in COPY_FIELDS)
+        if update_existing:
+            updates = ", ".join(
+                f"{qn(field.column)} = EXCLUDED.{qn(field.column)}"
+                for field in COPY_FIELDS[1:]
+            )
+            on_conflict = f"DO UPDATE SET {updates}"
+        else:
+            on_conflict = "DO NOTHING"
+        # ON CONFLICT may touch a row only once, so keep the last occurrence.
+        latest = {game_data.source_id: game_data for game_data in batch}
+
+        with _batch_transaction(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE game_staging AS "
+                f"SELECT {columns} FROM {table} WITH NO DATA"
+            )
+            with cursor.copy(f"COPY game_staging ({columns}) FROM STDIN") as copy:
+                for source_id, game_data in latest.items():
+                    values = {
+                        "source_id": source_id,
+                        **self._to_model_fields(game_data),
+                    }
+                    copy.write_row(
+                        [
+                            field.get_db_prep_save(values[field.attname], connection)
+                            for field in COPY_FIELDS
+                        ]
+                    )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}, {qn('created_at')}) "
+                f"SELECT {columns}, now() FROM game_staging "
+                f"ON CONFLICT ({qn('source_id')}) {on_conflict}"
+            )
+            cursor.execute("DROP TABLE game_staging")
+
+
+@contextmanager
+def _batch_transaction() -> Iterator[None]:
+    """Run one import batch in its own transaction.
+
+    On PostgreSQL the commit does not wait for the WAL flush. A crash can
+    lose the last few committed batches, but imports are idempotent by
+    source_id, so re-running the import restores them.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL synchronous_commit = off")
+        yield
+
+
+def _clear_debug_query_log() -> None:
+    """Drop the queries Django logged because DEBUG is on.
+
+    With DEBUG on, Django logs every query with its full SQL, so bulk
+    INSERTs would pile up in memory over a long import. Logs recorded with
+    DEBUG off (e.g. by CaptureQueriesContext) are left alone.
+    """
+    if settings.DEBUG:
+        reset_queries()
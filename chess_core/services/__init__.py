@@ -1,11 +1,21 @@
 """Services for chess game analysis."""
 
+from chess_core.services.analysis import GameAnalysis, analyze_game
 from chess_core.services.endgame import EndgameDetector, EndgameEntry
-from chess_core.services.openings import OpeningDetector, OpeningMatch
+from chess_core.services.openings import (
+    OpeningDetector,
+    OpeningMatch,
+    invalidate_opening_cache,
+    opening_fen_to_id,
+)
 
 __all__ = [
     "EndgameDetector",
     "EndgameEntry",
+    "GameAnalysis",
     "OpeningDetector",
     "OpeningMatch",
+    "analyze_game",
+    "invalidate_opening_cache",
+    "opening_fen_to_id",
 ]
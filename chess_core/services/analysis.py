@@ -0,0 +1,60 @@
+"""Single-pass game analysis combining opening and endgame detection."""
+
+from dataclasses import dataclass
+
+import chess
+
+from chess_core.behaviors import is_endgame_board
+from chess_core.services.endgame import EndgameEntry
+from chess_core.services.move_parsing import parse_san_moves
+from chess_core.services.openings import OpeningDetector, OpeningMatch
+
+
+@dataclass
+class GameAnalysis:
+    """Positions of interest found while replaying a game.
+
+    Attributes:
+        opening: The deepest known opening position, or None.
+        endgame: The first endgame position, or None.
+    """
+
+    opening: OpeningMatch | None
+    endgame: EndgameEntry | None
+
+
+def analyze_game(moves: str, detector: OpeningDetector) -> GameAnalysis:
+    """Detect the opening and the endgame entry of a game in one replay.
+
+    Gives the same results as OpeningDetector.detect_opening and
+    EndgameDetector.detect_endgame, but parses the SAN once for both.
+
+    Args:
+        moves: A move string in SAN format, e.g., "1. e4 e5 2. Nf3 Nc6".
+        detector: Detector holding the known opening positions.
+
+    Returns:
+        A GameAnalysis with the opening and endgame positions found. A
+        malformed, illegal or ambiguous move ends the replay, keeping the
+        positions found before it.
+    """
+    analysis = GameAnalysis(opening=None, endgame=None)
+    if not moves:
+        return analysis
+
+    board = chess.Board()
+
+    for ply, move_san in enumerate(parse_san_moves(moves), start=1):
+        try:
+            board.push(board.parse_san(move_san))
+        except ValueError:
+            # InvalidMoveError, IllegalMoveError or AmbiguousMoveError.
+            break
+
+        opening_fen = detector.match_position(board)
+        if opening_fen is not None:
+            analysis.opening = OpeningMatch(fen=opening_fen, ply=ply)
+        if analysis.endgame is None and is_endgame_board(board):
+            analysis.endgame = EndgameEntry(fen=board.fen(), ply=ply)
+
+    return analysis
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 
 import chess
 
-from chess_core.behaviors import is_endgame
+from chess_core.behaviors import is_endgame_board
 from chess_core.services.move_parsing import parse_san_moves
 
 
@@ -54,10 +54,10 @@ class EndgameDetector:
                 move = board.parse_san(move_san)
                 board.push(move)
                 ply += 1
-                fen = board.fen()
-                if is_endgame(fen):
-                    return EndgameEntry(fen=fen, ply=ply)
-            except (chess.InvalidMoveError, chess.AmbiguousMoveError):
+                if is_endgame_board(board):
+                    return EndgameEntry(fen=board.fen(), ply=ply)
+            except ValueError:
+                # InvalidMoveError, IllegalMoveError or AmbiguousMoveError.
                 break
 
         return None
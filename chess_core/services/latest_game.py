@@ -1,11 +1,15 @@
 """Service for fetching the most recent game per opening."""
 
+from collections.abc import Sequence
+
 from django.db.models import F
 
 from chess_core.models import Game
 
 
-def get_latest_game_for_opening(opening_id: int) -> Game | None:
+def get_latest_game_for_opening(
+    opening_id: int, fields: Sequence[str] | None = None
+) -> Game | None:
     """Return the most recent game for the given opening, or None.
 
     Orders by game date descending (nulls last), then by id descending
@@ -13,13 +17,14 @@ def get_latest_game_for_opening(opening_id: int) -> Game | None:
 
     Args:
         opening_id: Primary key of the Opening.
+        fields: If given, load only these Game fields (plus the primary key).
 
     Returns:
         The most recent Game with this opening, or None if there are no games.
     """
-    return (
-        Game.objects.filter(opening_id=opening_id)
-        .order_by(F("date").desc(nulls_last=True), "-id")
-        .select_related("opening")
-        .first()
+    qs = Game.objects.filter(opening_id=opening_id).order_by(
+        F("date").desc(nulls_last=True), "-id"
     )
+    if fields is not None:
+        qs = qs.only(*fields)
+    return qs.first()
@@ -1,5 +1,11 @@
 """Shared move parsing for chess services."""
 
+import re
+
+# Whole tokens that are not moves: anything ending in a dot (move numbers
+# such as "1." or "1..."), bare digits and dots, and result markers.
+_MOVE_NOISE_RE = re.compile(r"(?<!\S)(?:\S*\.|[\d.]+|1-0|0-1|1/2-1/2|\*)(?=\s|$)")
+
 
 def parse_san_moves(moves: str) -> list[str]:
     """Parse a move string into individual SAN moves.
@@ -10,12 +16,19 @@ def parse_san_moves(moves: str) -> list[str]:
     Returns:
         A list of SAN moves like ["e4", "e5", "Nf3", "Nc6"].
     """
-    tokens = moves.split()
-    san_moves = []
-    for token in tokens:
-        if token.endswith(".") or token.replace(".", "").isdigit():
-            continue
-        if token in ("1-0", "0-1", "1/2-1/2", "*"):
-            continue
-        san_moves.append(token)
-    return san_moves
+    return _MOVE_NOISE_RE.sub("", moves).split()
+
+
+def count_plies(moves: str) -> int | None:
+    """Count the half-moves (ply) in a move string.
+
+    Counts the same tokens parse_san_moves keeps; the PostgreSQL backfill
+    in backfill_move_count mirrors this rule in SQL.
+
+    Args:
+        moves: A move string in SAN format, e.g., "1. e4 e5 2. Nf3 Nc6".
+
+    Returns:
+        The number of half-moves (ply), or None if there are none.
+    """
+    return len(parse_san_moves(moves)) or None
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import date
 
 from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Q, QuerySet
-from django.db.models.functions import Coalesce, NullIf
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
 
 from chess_core.models import Game
 
@@ -123,13 +123,12 @@ class OpeningStatsService:
             white_wins, draws, black_wins, avg_moves. total_count is the
             number of openings matching the filters (all pages).
         """
-        qs = self._build_base_query()
-        qs = self._apply_filters(qs, filters)
-        qs = self._apply_aggregation(qs)
+        filtered = self._apply_filters(self._build_base_query(), filters)
+        total_count = self._count_openings(filtered, filters.threshold)
+        qs = self._apply_aggregation(filtered)
         qs = self._apply_threshold(qs, filters.threshold)
         qs = self._apply_percentage_annotations(qs)
         qs = self._apply_sort(qs, filters)
-        total_count = qs.count()
         page = max(1, filters.page)
         page_size = min(PAGE_SIZE_MAX, max(1, filters.page_size))
         start = (page - 1) * page_size
@@ -244,7 +243,8 @@ class OpeningStatsService:
         - white_wins: Count of games where result is "1-0"
         - draws: Count of games where result is "1/2-1/2"
         - black_wins: Count of games where result is "0-1"
-        - avg_moves: Average move_count across games
+        - avg_moves: Average move_count across games, in moves, rounded to
+          two decimals
         """
         return qs.values(
             "opening_id",
@@ -256,8 +256,11 @@ class OpeningStatsService:
             white_wins=Count("id", filter=Q(result="1-0")),
             draws=Count("id", filter=Q(result="1/2-1/2")),
             black_wins=Count("id", filter=Q(result="0-1")),
-            avg_moves=Avg("move_count_ply")
-            / 2.0,  # Divide by 2 to get the game's move number, not ply.
+            # Divide by 2 to get the game's move number, not ply. Round casts
+            # to numeric on PostgreSQL, so cast back to keep a float.
+            avg_moves=Cast(
+                Round(Avg("move_count_ply") / 2.0, 2), output_field=FloatField()
+            ),
         )
 
     def _apply_threshold(self, qs: QuerySet, threshold: int) -> QuerySet:
@@ -266,6 +269,16 @@ class OpeningStatsService:
             qs = qs.filter(game_count__gte=threshold)
         return qs
 
+    def _count_openings(self, qs: QuerySet, threshold: int) -> int:
+        """Count openings passing the threshold in a filtered game query.
+
+        Groups by opening_id with game_count only, so the COUNT subquery
+        skips the result aggregates, opening join and ordering of the page
+        query.
+        """
+        qs = qs.values("opening_id").annotate(game_count=Count("id"))
+        return self._apply_threshold(qs, threshold).count()
+
     def _apply_percentage_annotations(self, qs: QuerySet) -> QuerySet:
         """Annotate white_pct, draw_pct, black_pct (0–100) for sorting."""
         denom = Coalesce(NullIf(F("game_count"), 0), 1)
@@ -292,3 +305,7 @@ class OpeningStatsService:
         query_field = SORT_FIELD_TO_QUERY[sort_by]
         prefix = "-" if order == "desc" else ""
         return qs.order_by(f"{prefix}{query_field}")
+
+
+# OpeningStatsService is stateless, so one instance serves every request.
+OPENING_STATS_SERVICE = OpeningStatsService()
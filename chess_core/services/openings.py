@@ -1,8 +1,13 @@
 """Opening detection service for chess games."""
 
-from dataclasses import dataclass
+from collections.abc import Iterable
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass, field
 
 import chess
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from chess_core.models import Opening
 from chess_core.services.move_parsing import parse_san_moves
@@ -21,60 +26,320 @@ class OpeningMatch:
     ply: int
 
 
+def _position_key(board: chess.Board) -> tuple:
+    """Return a key for the position part of a board's FEN.
+
+    Built from the board's bitboards, side to move, castling rights and
+    legal en passant square, i.e. the FEN without its halfmove and fullmove
+    counters. Two boards share a key exactly when their FEN prefixes are
+    equal, but the key costs a fraction of building board.fen() or
+    board.epd(). Only public Board attributes are used, so the key does not
+    change with python-chess internals.
+
+    Args:
+        board: The board to key.
+
+    Returns:
+        A hashable position key.
+    """
+    return (
+        board.pawns,
+        board.knights,
+        board.bishops,
+        board.rooks,
+        board.queens,
+        board.kings,
+        board.occupied_co[chess.WHITE],
+        board.occupied_co[chess.BLACK],
+        board.turn,
+        board.clean_castling_rights(),
+        board.ep_square if board.has_legal_en_passant() else None,
+    )
+
+
+@dataclass(slots=True)
+class _PositionIndex:
+    """Known opening positions, indexed for lookup while replaying games.
+
+    Attributes:
+        fen_by_key: Position key to {(halfmove clock, fullmove number): FEN}.
+        min_pieces: Fewest pieces on the board in any indexed position.
+    """
+
+    fen_by_key: dict[tuple, dict[tuple[int, int], str]]
+    min_pieces: int
+
+
+def _index_fens(fens: Iterable[str]) -> _PositionIndex:
+    """Group FENs by position key, then by their move counters.
+
+    The same position can be stored with different move counters when
+    openings transpose. Strings that are not valid FENs can never match a
+    replayed position, so they are left out.
+
+    Args:
+        fens: Opening FEN strings.
+
+    Returns:
+        The position index of the FENs.
+    """
+    fen_by_key: dict[tuple, dict[tuple[int, int], str]] = {}
+    piece_counts = set()
+    for fen in fens:
+        try:
+            board = chess.Board(fen)
+        except ValueError:
+            continue
+        clocks = (board.halfmove_clock, board.fullmove_number)
+        fen_by_key.setdefault(_position_key(board), {})[clocks] = fen
+        piece_counts.add(board.occupied.bit_count())
+    return _PositionIndex(
+        fen_by_key=fen_by_key, min_pieces=min(piece_counts, default=0)
+    )
+
+
+# Rows fetched per round trip when loading the opening FEN → id mapping.
+OPENING_CACHE_CHUNK_SIZE = 5000
+
+# Process-wide opening FEN → id mapping and the (row count, highest id)
+# stamp of the Opening table it was loaded from; see opening_fen_to_id.
+_fen_to_id: dict[str, int] | None = None
+_fen_to_id_stamp: tuple[int, int | None] | None = None
+
+# Bounds on the move trie shared by all games a detector sees. Games mostly
+# diverge within the first moves, so deeper nodes would rarely be reused.
+_TRIE_MAX_PLY = 16
+_TRIE_MAX_NODES = 50_000
+
+
+def opening_fen_to_id() -> dict[str, int]:
+    """Return the process-wide mapping of opening FEN to Opening id.
+
+    The mapping is shared by every caller and rebuilt only when an Opening
+    is saved or deleted, or when the table's row count or highest id
+    changes (bulk_create sends no signals). Callers must not modify it.
+
+    Returns:
+        Dictionary of opening FEN to Opening ID.
+    """
+    global _fen_to_id, _fen_to_id_stamp
+    stamp = tuple(
+        Opening.objects.aggregate(count=Count("id"), last_id=Max("id")).values()
+    )
+    if _fen_to_id is None or stamp != _fen_to_id_stamp:
+        # Stream rows so the queryset result cache is never materialized.
+        _fen_to_id = dict(
+            Opening.objects.values_list("fen", "id").iterator(
+                chunk_size=OPENING_CACHE_CHUNK_SIZE
+            )
+        )
+        _fen_to_id_stamp = stamp
+    return _fen_to_id
+
+
+def invalidate_opening_cache() -> None:
+    """Force the next opening_fen_to_id call to reload the table."""
+    global _fen_to_id
+    _fen_to_id = None
+
+
+@dataclass(slots=True)
+class _MoveNode:
+    """Position reached by a sequence of SAN moves from the start.
+
+    Attributes:
+        board: Board at this position, never pushed onto directly.
+        match: FEN of the known opening at this position, or None.
+        children: Next node keyed by SAN move.
+    """
+
+    board: chess.Board
+    match: str | None
+    children: dict[str, "_MoveNode"] = field(default_factory=dict)
+
+
 class OpeningDetector:
     """Detects chess openings by matching FEN positions against the Opening table.
 
     The detector loads all known opening FENs into memory for fast lookup,
     then replays game moves to find the deepest matching opening position.
+    The position index built from the FENs is shared by every detector in
+    the process that uses the same FENs.
     """
 
-    def __init__(self, fen_set: set[str] | None = None) -> None:
+    _indexed_fens: frozenset[str] | None = None
+    _shared_index: _PositionIndex | None = None
+
+    def __init__(self, fen_set: AbstractSet[str] | None = None) -> None:
         """Load opening FENs for fast lookup.
 
         When fen_set is provided, it is used as the set of known FENs and
         no database query is performed (useful when reusing a repository-level
-        cache). When fen_set is None, FENs are loaded from the Opening table.
+        cache). When fen_set is None, FENs are taken from opening_fen_to_id().
+        """
+        if fen_set is None:
+            fen_set = opening_fen_to_id().keys()
+        self._fen_set = frozenset(fen_set)
+        index = self._index(self._fen_set)
+        self._fen_by_key = index.fen_by_key
+        self._min_pieces = index.min_pieces
+        self._root = _MoveNode(board=chess.Board(), match=None)
+        self._trie_size = 0
+
+    @classmethod
+    def _index(cls, fen_set: frozenset[str]) -> _PositionIndex:
+        """Return the position index for fen_set, reusing the last one built.
+
+        Args:
+            fen_set: Opening FEN strings.
+
+        Returns:
+            The position index of the FENs.
+        """
+        if cls._shared_index is None or (
+            fen_set is not cls._indexed_fens and fen_set != cls._indexed_fens
+        ):
+            cls._shared_index = _index_fens(fen_set)
+            cls._indexed_fens = fen_set
+        return cls._shared_index
+
+    def match_position(self, board: chess.Board) -> str | None:
+        """Return the FEN of the known opening at the board's position.
+
+        Move counters are ignored, so a position reached by transposition
+        still matches. When several stored FENs share the position, the one
+        with the board's own counters wins, otherwise the lowest counters.
+
+        Args:
+            board: The board to look up.
+
+        Returns:
+            The stored opening FEN, or None if the position is not a known
+            opening.
+        """
+        fens = self._fen_by_key.get(_position_key(board))
+        if fens is None:
+            return None
+        clocks = (board.halfmove_clock, board.fullmove_number)
+        return fens.get(clocks) or fens[min(fens)]
+
+    def _child(self, node: _MoveNode, move_san: str, ply: int) -> _MoveNode | None:
+        """Return the trie node reached by playing a move from node.
+
+        Unseen moves are replayed once and added while the trie is within
+        its depth and size bounds.
+
+        Args:
+            node: The node the move is played from.
+            move_san: The move in SAN.
+            ply: The ply number the move would reach.
+
+        Returns:
+            The child node, or None if the move is not in the trie and the
+            trie is full or too deep to add it, or the move cannot be
+            played from node.
         """
-        if fen_set is not None:
-            self._fen_set = fen_set
-        else:
-            self._fen_set = set(Opening.objects.values_list("fen", flat=True))
+        child = node.children.get(move_san)
+        if child is None and ply <= _TRIE_MAX_PLY and self._trie_size < _TRIE_MAX_NODES:
+            board = node.board.copy(stack=False)
+            try:
+                board.push(board.parse_san(move_san))
+            except ValueError:
+                # Left to the replay, which stops at the previous position.
+                return None
+            child = _MoveNode(board=board, match=self.match_position(board))
+            node.children[move_san] = child
+            self._trie_size += 1
+        return child
 
     def detect_opening(self, moves: str) -> OpeningMatch | None:
         """Detect the opening played in a game by its move string.
 
-        Replays the moves on a board, generates FEN after each move,
-        and returns the deepest (latest) matching opening.
+        Walks the detector's move trie for as long as the game follows
+        moves already seen, then replays the rest on a board, looking up
+        the position after each move. Returns the deepest (latest) matching
+        opening. Captures are irreversible, so the replay stops once fewer
+        pieces remain than in any known opening.
 
         Args:
             moves: A move string in SAN format, e.g., "1. e4 e5 2. Nf3 Nc6".
 
         Returns:
             An OpeningMatch with the FEN and ply of the deepest match,
-            or None if no opening was found.
+            or None if no opening was found. A malformed, illegal or
+            ambiguous move ends detection at the previous position.
         """
-        if not moves or not self._fen_set:
+        if not moves or not self._fen_by_key:
             return None
 
-        board = chess.Board()
+        node = self._root
+        board: chess.Board | None = None
         last_match: OpeningMatch | None = None
-        ply = 0
 
-        parsed_moves = parse_san_moves(moves)
+        try:
+            for ply, move_san in enumerate(parse_san_moves(moves), start=1):
+                if board is None:
+                    child = self._child(node, move_san, ply)
+                    if child is not None:
+                        node = child
+                        if node.board.occupied.bit_count() < self._min_pieces:
+                            break
+                        if node.match is not None:
+                            last_match = OpeningMatch(fen=node.match, ply=ply)
+                        continue
+                    board = node.board.copy(stack=False)
 
-        for move_san in parsed_moves:
-            try:
-                move = board.parse_san(move_san)
-                board.push(move)
-                ply += 1
+                board.push(board.parse_san(move_san))
+                if board.occupied.bit_count() < self._min_pieces:
+                    break
+                fen = self.match_position(board)
+                if fen is not None:
+                    last_match = OpeningMatch(fen=fen, ply=ply)
+
+        except ValueError:
+            # InvalidMoveError, IllegalMoveError or AmbiguousMoveError.
+            pass
+
+        return last_match
 
-                # Get full FEN for exact matching
-                full_fen = board.fen()
+    def detect_opening_uci(self, uci_moves: Iterable[str]) -> OpeningMatch | None:
+        """Detect the opening played in a game given as UCI moves.
 
-                if full_fen in self._fen_set:
-                    last_match = OpeningMatch(fen=full_fen, ply=ply)
+        Preferred over detect_opening for callers that already hold moves
+        in coordinate form (e.g. "e2e4"), since parsing UCI skips the
+        move generation SAN needs for disambiguation.
 
-            except (chess.InvalidMoveError, chess.AmbiguousMoveError):
-                break
+        Args:
+            uci_moves: Moves in UCI notation, e.g., ["e2e4", "e7e5"].
+
+        Returns:
+            An OpeningMatch with the FEN and ply of the deepest match,
+            or None if no opening was found. A malformed or illegal move
+            ends detection at the previous position.
+        """
+        if not self._fen_by_key:
+            return None
+
+        board = chess.Board()
+        last_match: OpeningMatch | None = None
+
+        try:
+            for ply, uci in enumerate(uci_moves, start=1):
+                board.push(board.parse_uci(uci))
+                if board.occupied.bit_count() < self._min_pieces:
+                    break
+                fen = self.match_position(board)
+                if fen is not None:
+                    last_match = OpeningMatch(fen=fen, ply=ply)
+
+        except ValueError:
+            # InvalidMoveError or IllegalMoveError.
+            pass
 
         return last_match
+
+
+@receiver([post_save, post_delete], sender=Opening)
+def _invalidate_opening_cache(sender, **kwargs) -> None:
+    """Drop the shared opening mapping when an Opening changes."""
+    invalidate_opening_cache()
@@ -5,7 +5,6 @@ from datetime import date
 from typing import Literal
 
 from django.db.models import Count, Q, QuerySet
-from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
 
 from chess_core.models import Game
 
@@ -13,6 +12,9 @@ PeriodType = Literal["week", "month", "year"]
 
 MAX_POINTS = {"week": 520, "month": 120, "year": 20}
 
+# Indexed generated Game columns holding the first day of each period.
+PERIOD_BUCKET_FIELDS = {"week": "date_week", "month": "date_month", "year": "date_year"}
+
 
 @dataclass
 class WinRateOverTimeFilterParams:
@@ -63,31 +65,22 @@ def get_win_rate_over_time(
     """Return time-series points of white/draw/black win percentages by period.
 
     Uses Game.date for the X axis; buckets by week, month, or year per
-    filters.period. Excludes games with null date.
+    filters.period using the stored date_week/date_month/date_year columns.
+    Excludes games with null date.
     """
     qs = Game.objects.filter(date__isnull=False)
     qs = _apply_filters(qs, filters)
 
-    if filters.period == "week":
-        trunc = TruncWeek("date")
-    elif filters.period == "month":
-        trunc = TruncMonth("date")
-    else:
-        trunc = TruncYear("date")
-
-    qs = (
-        qs.annotate(period_date=trunc)
-        .values("period_date")
-        .annotate(
-            game_count=Count("id"),
-            white_wins=Count("id", filter=Q(result="1-0")),
-            draws=Count("id", filter=Q(result="1/2-1/2")),
-            black_wins=Count("id", filter=Q(result="0-1")),
-        )
+    bucket = PERIOD_BUCKET_FIELDS[filters.period]
+    qs = qs.values(bucket).annotate(
+        game_count=Count("id"),
+        white_wins=Count("id", filter=Q(result="1-0")),
+        draws=Count("id", filter=Q(result="1/2-1/2")),
+        black_wins=Count("id", filter=Q(result="0-1")),
     )
     if filters.min_games > 0:
         qs = qs.filter(game_count__gte=filters.min_games)
-    qs = qs.order_by("period_date")
+    qs = qs.order_by(bucket)
 
     cap = MAX_POINTS.get(filters.period)
     if cap is not None:
@@ -95,7 +88,7 @@ def get_win_rate_over_time(
 
     items: list[dict] = []
     for row in qs:
-        period_date = row["period_date"]
+        period_date = row[bucket]
         if period_date is None:
             continue
         if hasattr(period_date, "date"):
@@ -1,14 +1,32 @@
 """Shared fixtures for games app tests."""
 
-import tempfile
+from io import StringIO
 from pathlib import Path
 
 import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
 
 from chess_core.models import Opening
+from chess_core.services.openings import invalidate_opening_cache
+from chess_core.tests.constants import FEN_AFTER_E4, FEN_AFTER_E4_E5, FEN_RUY_LOPEZ
 
 
-@pytest.fixture
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    """Skip tests marked postgresql unless the database is PostgreSQL."""
+    if item.get_closest_marker("postgresql") and connection.vendor != "postgresql":
+        pytest.skip("needs PostgreSQL (set DATABASE_URL)")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start each test with an empty Django cache and opening cache."""
+    cache.clear()
+    invalidate_opening_cache()
+
+
+@pytest.fixture(scope="session")
 def sample_pgn_content() -> str:
     """Valid PGN with one game."""
     return """[Event "Test Event"]
@@ -27,7 +45,7 @@ def sample_pgn_content() -> str:
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def multi_game_pgn() -> str:
     """PGN with multiple games."""
     return """[Event "Game 1"]
@@ -62,7 +80,7 @@ def multi_game_pgn() -> str:
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def malformed_pgn() -> str:
     """Invalid PGN for error handling tests."""
     return """[Event "Broken Game"]
@@ -73,7 +91,7 @@ def malformed_pgn() -> str:
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def pgn_with_missing_headers() -> str:
     """PGN with minimal headers."""
     return """[Result "*"]
@@ -82,7 +100,7 @@ def pgn_with_missing_headers() -> str:
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def pgn_with_partial_date() -> str:
     """PGN with partial date (unknown day/month)."""
     return """[Event "Test"]
@@ -97,31 +115,48 @@ def pgn_with_partial_date() -> str:
 """
 
 
-@pytest.fixture
-def temp_pgn_file(sample_pgn_content: str) -> Path:
-    """Create a temporary PGN file for testing."""
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".pgn", delete=False, encoding="utf-8"
-    ) as f:
-        f.write(sample_pgn_content)
-        return Path(f.name)
+@pytest.fixture(scope="session")
+def temp_pgn_file(
+    tmp_path_factory: pytest.TempPathFactory, sample_pgn_content: str
+) -> Path:
+    """Write the single-game PGN once per session; tests must not modify it."""
+    path = tmp_path_factory.mktemp("pgn") / "game.pgn"
+    path.write_text(sample_pgn_content, encoding="utf-8")
+    return path
 
 
-@pytest.fixture
-def temp_multi_game_pgn_file(multi_game_pgn: str) -> Path:
-    """Create a temporary PGN file with multiple games."""
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".pgn", delete=False, encoding="utf-8"
-    ) as f:
-        f.write(multi_game_pgn)
-        return Path(f.name)
+@pytest.fixture(scope="session")
+def temp_multi_game_pgn_file(
+    tmp_path_factory: pytest.TempPathFactory, multi_game_pgn: str
+) -> Path:
+    """Write the multi-game PGN once per session; tests must not modify it."""
+    path = tmp_path_factory.mktemp("pgn") / "games.pgn"
+    path.write_text(multi_game_pgn, encoding="utf-8")
+    return path
+
+
+@pytest.fixture(scope="class")
+def loaded_openings(django_db_setup, django_db_blocker) -> str:
+    """Run load_openings once for a test class and return its output.
+
+    The bundled ECO files hold thousands of openings, so loading them per
+    test dominates the suite. The rows are written in an outer transaction
+    that each test's own transaction nests inside, and rolled back after
+    the class. Only use it from classes of non-transactional tests that
+    all expect the openings to be loaded.
+    """
+    with django_db_blocker.unblock(), transaction.atomic():
+        out = StringIO()
+        call_command("load_openings", stdout=out)
+        yield out.getvalue()
+        transaction.set_rollback(True)
 
 
 @pytest.fixture
 def sample_opening(db) -> Opening:
     """Create a sample Opening for testing."""
     return Opening.objects.create(
-        fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+        fen=FEN_AFTER_E4,
         eco_code="B00",
         name="King's Pawn Game",
         moves="1. e4",
@@ -135,7 +170,7 @@ def sample_opening(db) -> Opening:
 def ruy_lopez_opening(db) -> Opening:
     """Create Ruy Lopez opening for testing."""
     return Opening.objects.create(
-        fen="r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+        fen=FEN_RUY_LOPEZ,
         eco_code="C60",
         name="Ruy Lopez",
         moves="1. e4 e5 2. Nf3 Nc6 3. Bb5",
@@ -150,14 +185,14 @@ def opening_set(db) -> list[Opening]:
     """Create a set of openings for comprehensive testing."""
     openings = [
         Opening(
-            fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+            fen=FEN_AFTER_E4,
             eco_code="B00",
             name="King's Pawn Game",
             moves="1. e4",
             ply_count=1,
         ),
         Opening(
-            fen="rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+            fen=FEN_AFTER_E4_E5,
             eco_code="C20",
             name="King's Pawn Game: Open Game",
             moves="1. e4 e5",
@@ -178,7 +213,7 @@ def opening_set(db) -> list[Opening]:
             ply_count=4,
         ),
         Opening(
-            fen="r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+            fen=FEN_RUY_LOPEZ,
             eco_code="C60",
             name="Ruy Lopez",
             moves="1. e4 e5 2. Nf3 Nc6 3. Bb5",
@@ -13,10 +13,10 @@ class OpeningFactory(DjangoModelFactory):
         model = Opening
 
     fen = factory.Sequence(
-        lambda n: f"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 {n}"
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 {}".format
     )
-    eco_code = factory.Sequence(lambda n: f"A{n:02d}")
-    name = factory.Sequence(lambda n: f"Test Opening {n}")
+    eco_code = factory.Sequence("A{:02d}".format)
+    name = factory.Sequence("Test Opening {}".format)
     moves = factory.Sequence(lambda n: f"1. e{n % 4 + 1}")
     ply_count = 1
     source = "test"
@@ -29,13 +29,13 @@ class GameFactory(DjangoModelFactory):
     class Meta:
         model = Game
 
-    source_id = factory.Sequence(lambda n: f"game_{n:08d}")
-    event = factory.Sequence(lambda n: f"Test Event {n}")
+    source_id = factory.Sequence("game_{:08d}".format)
+    event = factory.Sequence("Test Event {}".format)
     site = "Test Site"
     date = factory.LazyFunction(lambda: None)
     round = "1"
-    white_player = factory.Sequence(lambda n: f"White Player {n}")
-    black_player = factory.Sequence(lambda n: f"Black Player {n}")
+    white_player = factory.Sequence("White Player {}".format)
+    black_player = factory.Sequence("Black Player {}".format)
     result = "1-0"
     white_elo = 2500
     black_elo = 2400
@@ -1,8 +1,9 @@
-"""Tests for chess_core.behaviors.is_endgame."""
+"""Tests for chess_core.behaviors endgame detection."""
 
+import chess
 import pytest
 
-from chess_core.behaviors import ENDGAME_THRESHOLD, is_endgame
+from chess_core.behaviors import ENDGAME_THRESHOLD, is_endgame, is_endgame_board
 
 FEN_START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 FEN_KR_VS_K = "4r3/8/8/8/8/8/8/4K3 w - - 0 1"
@@ -52,3 +53,22 @@ class TestIsEndgame:
         # Many pawns and both kings, but only 2 rooks
         fen = "r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1"
         assert is_endgame(fen) is True
+
+
+class TestIsEndgameBoard:
+    """Tests for is_endgame_board function."""
+
+    @pytest.mark.parametrize(
+        "fen",
+        [
+            FEN_START,
+            FEN_KR_VS_K,
+            FEN_SIX_PIECES,
+            FEN_SEVEN_PIECES,
+            "4k3/8/8/8/8/8/8/4K3 w - - 0 1",
+            "r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1",
+        ],
+    )
+    def test_agrees_with_is_endgame(self, fen: str) -> None:
+        """Counting bitboards gives the same answer as counting FEN letters."""
+        assert is_endgame_board(chess.Board(fen)) is is_endgame(fen)
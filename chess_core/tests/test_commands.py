@@ -1,14 +1,19 @@
 """Tests for management commands."""
 
-import tempfile
 from io import StringIO
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from django.core.management import call_command
 from django.core.management.base import CommandError
+from django.db.models.expressions import RawSQL
 
+from chess_core.management.commands.backfill_move_count import MOVE_COUNT_PLY_SQL
 from chess_core.models import Game, Opening
+from chess_core.services import EndgameEntry
+from chess_core.services.move_parsing import count_plies
+from chess_core.services.openings import OpeningDetector
 
 from .factories import GameFactory, OpeningFactory
 
@@ -17,26 +22,18 @@ from .factories import GameFactory, OpeningFactory
 class TestImportGamesCommand:
     """Tests for import_games management command."""
 
-    def test_import_single_game(self, sample_pgn_content: str):
+    def test_import_single_game(self, temp_pgn_file: Path):
         """Import PGN file with single game."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(sample_pgn_content)
-            path = f.name
-
         out = StringIO()
-        call_command("import_games", path, stdout=out)
+        call_command("import_games", temp_pgn_file, stdout=out)
 
         assert Game.objects.count() == 1
         assert "Processed 1 games" in out.getvalue()
 
-    def test_import_multiple_games(self, multi_game_pgn: str):
+    def test_import_multiple_games(self, temp_multi_game_pgn_file: Path):
         """Import PGN file with multiple games."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(multi_game_pgn)
-            path = f.name
-
         out = StringIO()
-        call_command("import_games", path, stdout=out)
+        call_command("import_games", temp_multi_game_pgn_file, stdout=out)
 
         assert Game.objects.count() == 3
         assert "Processed 3 games" in out.getvalue()
@@ -47,83 +44,108 @@ class TestImportGamesCommand:
             call_command("import_games", "/nonexistent/file.pgn")
 
     def test_import_directory_imports_all_pgn_files(
-        self, sample_pgn_content: str, multi_game_pgn: str
+        self, tmp_path: Path, sample_pgn_content: str, multi_game_pgn: str
     ):
         """Import directory processes all matching PGN files."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            dir_path = Path(tmpdir)
-            (dir_path / "a.pgn").write_text(sample_pgn_content)
-            (dir_path / "b.pgn").write_text(multi_game_pgn)
+        (tmp_path / "a.pgn").write_text(sample_pgn_content)
+        (tmp_path / "b.pgn").write_text(multi_game_pgn)
 
-            out = StringIO()
-            call_command("import_games", str(dir_path), stdout=out)
+        out = StringIO()
+        call_command("import_games", str(tmp_path), stdout=out)
 
-            assert Game.objects.count() == 4
-            assert "2 file(s)" in out.getvalue()
-            assert "Processed 4 games" in out.getvalue()
+        assert Game.objects.count() == 4
+        assert "2 file(s)" in out.getvalue()
+        assert "Processed 4 games" in out.getvalue()
 
-    def test_import_directory_empty_no_matching_files_raises(self):
+    def test_import_directory_empty_no_matching_files_raises(self, tmp_path: Path):
         """Import directory with no matching files raises CommandError."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            with pytest.raises(CommandError, match="No .*\\.pgn files found"):
-                call_command("import_games", tmpdir)
+        with pytest.raises(CommandError, match="No .*\\.pgn files found"):
+            call_command("import_games", str(tmp_path))
 
-    def test_import_with_batch_size(self, multi_game_pgn: str):
+    def test_import_with_batch_size(self, temp_multi_game_pgn_file: Path):
         """Import with custom batch size."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(multi_game_pgn)
-            path = f.name
-
         out = StringIO()
-        call_command("import_games", path, "--batch-size", "1", stdout=out)
+        call_command(
+            "import_games", temp_multi_game_pgn_file, "--batch-size", "1", stdout=out
+        )
 
         assert Game.objects.count() == 3
         assert "Batch size: 1" in out.getvalue()
 
-    def test_import_with_opening_detection(self, sample_pgn_content: str):
-        """Import detects openings when Opening table populated."""
-        # Create an opening that matches the game
-        Opening.objects.create(
-            fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
-            eco_code="B00",
-            name="King's Pawn Game",
-            moves="1. e4",
-            ply_count=1,
+    @pytest.mark.django_db(transaction=True)
+    def test_import_with_writer_threads(self, temp_multi_game_pgn_file: Path):
+        """Import writing batches on background threads saves every game."""
+        out = StringIO()
+        call_command(
+            "import_games",
+            temp_multi_game_pgn_file,
+            "--batch-size",
+            "1",
+            "--writer-threads",
+            "1",
+            stdout=out,
         )
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(sample_pgn_content)
-            path = f.name
+        assert Game.objects.count() == 3
+        assert "Processed 3 games" in out.getvalue()
+
+    def test_import_with_copy(self, temp_multi_game_pgn_file: Path):
+        """--copy imports every game (falling back off PostgreSQL)."""
+        call_command(
+            "import_games", temp_multi_game_pgn_file, "--copy", stdout=StringIO()
+        )
+
+        assert Game.objects.count() == 3
 
+    def test_import_without_validation(self, temp_multi_game_pgn_file: Path):
+        """--no-validate imports every game with the same moves."""
+        call_command(
+            "import_games", temp_multi_game_pgn_file, "--no-validate", stdout=StringIO()
+        )
+
+        assert Game.objects.count() == 3
+        assert Game.objects.get(white_player="White2").moves == "1. d4 d5 0-1"
+
+    def test_import_without_validation_keeps_illegal_moves(self, tmp_path: Path):
+        """--no-validate stores an illegal game instead of aborting the import."""
+        pgn = tmp_path / "illegal.pgn"
+        pgn.write_text(
+            '[Event "Illegal"]\n[White "A"]\n[Black "B"]\n[Result "*"]\n\n'
+            "1. e4 Ke7 2. Nf3 *\n\n"
+            '[Event "Legal"]\n[White "C"]\n[Black "D"]\n[Result "*"]\n\n'
+            "1. d4 d5 *\n"
+        )
+
+        call_command("import_games", pgn, "--no-validate", stdout=StringIO())
+
+        assert Game.objects.count() == 2
+        assert Game.objects.get(event="Illegal").moves == "1. e4 Ke7 2. Nf3 *"
+
+    def test_import_with_opening_detection(
+        self, sample_opening: Opening, temp_pgn_file: Path
+    ):
+        """Import detects openings when Opening table populated."""
         out = StringIO()
-        call_command("import_games", path, stdout=out)
+        call_command("import_games", temp_pgn_file, stdout=out)
 
-        game = Game.objects.first()
+        game = Game.objects.select_related("opening").only("opening").first()
         assert game.opening is not None
         assert game.opening.eco_code == "B00"
 
-    def test_import_skips_duplicates(self, sample_pgn_content: str):
+    def test_import_skips_duplicates(self, temp_pgn_file: Path):
         """Import skips duplicate games."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(sample_pgn_content)
-            path = f.name
-
         # Import twice
-        call_command("import_games", path, stdout=StringIO())
+        call_command("import_games", temp_pgn_file, stdout=StringIO())
         out = StringIO()
-        call_command("import_games", path, stdout=out)
+        call_command("import_games", temp_pgn_file, stdout=out)
 
         assert Game.objects.count() == 1
         assert "New games added: 0" in out.getvalue()
 
-    def test_import_reports_statistics(self, sample_pgn_content: str):
+    def test_import_reports_statistics(self, temp_pgn_file: Path):
         """Import reports processing statistics."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(sample_pgn_content)
-            path = f.name
-
         out = StringIO()
-        call_command("import_games", path, stdout=out)
+        call_command("import_games", temp_pgn_file, stdout=out)
         output = out.getvalue()
 
         assert "Processed" in output
@@ -135,29 +157,10 @@ class TestImportGamesCommand:
 class TestLoadOpeningsCommand:
     """Tests for load_openings management command."""
 
-    def test_load_openings_from_data_directory(self):
-        """Load openings from default data directory."""
-        out = StringIO()
-        call_command("load_openings", stdout=out)
-
-        # Should load openings from all ECO files
-        assert Opening.objects.count() > 0
-        assert "Loading openings from:" in out.getvalue()
-
-    def test_load_openings_reports_per_file(self):
-        """Load command reports loaded count per file."""
-        out = StringIO()
-        call_command("load_openings", stdout=out)
-        output = out.getvalue()
-
-        assert "ecoA.json" in output
-        assert "ecoB.json" in output
-        assert "Loaded:" in output
-
     def test_load_openings_with_clear(self):
         """Load with --clear deletes existing openings."""
         # Create some openings first
-        OpeningFactory.create_batch(3)
+        Opening.objects.bulk_create(OpeningFactory.build_batch(3))
         assert Opening.objects.count() == 3
 
         out = StringIO()
@@ -167,10 +170,33 @@ class TestLoadOpeningsCommand:
         # Should have ECO openings, not the factory ones
         assert Opening.objects.count() > 3
 
-    def test_load_openings_handles_duplicates(self):
+    def test_load_openings_custom_data_dir(self, tmp_path: Path):
+        """Load from custom data directory."""
+        # This should fail because directory is empty
+        err = StringIO()
+        call_command("load_openings", "--data-dir", str(tmp_path), stderr=err)
+
+        assert "Missing files:" in err.getvalue()
+
+
+@pytest.mark.django_db
+class TestLoadOpeningsData:
+    """Tests against the bundled ECO openings, loaded once for the class."""
+
+    def test_load_openings_from_data_directory(self, loaded_openings: str):
+        """Load openings from default data directory."""
+        # Should load openings from all ECO files
+        assert Opening.objects.count() > 0
+        assert "Loading openings from:" in loaded_openings
+
+    def test_load_openings_reports_per_file(self, loaded_openings: str):
+        """Load command reports loaded count per file."""
+        assert "ecoA.json" in loaded_openings
+        assert "ecoB.json" in loaded_openings
+        assert "Loaded:" in loaded_openings
+
+    def test_load_openings_handles_duplicates(self, loaded_openings: str):
         """Load handles duplicate FENs gracefully."""
-        # Load once
-        call_command("load_openings", stdout=StringIO())
         count_first = Opening.objects.count()
 
         # Load again (without clear)
@@ -181,14 +207,6 @@ class TestLoadOpeningsCommand:
         assert Opening.objects.count() == count_first
         assert "Skipped (duplicates):" in out.getvalue()
 
-    def test_load_openings_custom_data_dir(self, tmp_path: Path):
-        """Load from custom data directory."""
-        # This should fail because directory is empty
-        err = StringIO()
-        call_command("load_openings", "--data-dir", str(tmp_path), stderr=err)
-
-        assert "Missing files:" in err.getvalue()
-
 
 @pytest.mark.django_db
 class TestDetectOpeningsCommand:
@@ -201,77 +219,64 @@ class TestDetectOpeningsCommand:
 
         assert "No games to process" in out.getvalue()
 
-    def test_detect_games_without_openings(self):
+    def test_detect_games_without_openings(
+        self, sample_opening: Opening, django_assert_num_queries
+    ):
         """Detect openings for games without them."""
         # Create a game without opening
         GameFactory(opening=None, moves="1. e4 e5")
 
-        # Create matching opening
-        Opening.objects.create(
-            fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
-            eco_code="B00",
-            name="King's Pawn Game",
-            moves="1. e4",
-            ply_count=1,
-        )
-
         out = StringIO()
-        call_command("detect_openings", stdout=out)
+        # Opening cache stamp and load, game count, one batch and its
+        # UPDATE, the empty page ending the loop, and the summary.
+        with django_assert_num_queries(7):
+            call_command("detect_openings", stdout=out)
 
-        game = Game.objects.first()
+        game = Game.objects.select_related("opening").only("opening").first()
         assert game.opening is not None
         assert "updated 1 with openings" in out.getvalue()
 
-    def test_detect_skips_games_with_openings(self):
+    def test_detect_skips_games_with_openings(self, django_assert_num_queries):
         """Detect skips games that already have openings."""
         opening = OpeningFactory()
         GameFactory(opening=opening)
 
         out = StringIO()
-        call_command("detect_openings", stdout=out)
+        # Only the COUNT of games without an opening; no opening load
+        with django_assert_num_queries(1):
+            call_command("detect_openings", stdout=out)
 
         assert "No games to process" in out.getvalue()
 
-    def test_detect_force_redetects_all(self):
+    def test_detect_force_redetects_all(self, sample_opening: Opening):
         """Detect with --force re-detects all games."""
         opening = OpeningFactory()
         GameFactory(opening=opening, moves="1. e4 e5")
 
-        # Create a different opening that matches the moves
-        Opening.objects.create(
-            fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
-            eco_code="B00",
-            name="King's Pawn Game",
-            moves="1. e4",
-            ply_count=1,
-        )
-
         out = StringIO()
         call_command("detect_openings", "--force", stdout=out)
 
         assert "Processing all games (--force mode)" in out.getvalue()
 
-    def test_detect_with_batch_size(self):
+    def test_detect_with_batch_size(self, django_assert_num_queries):
         """Detect with custom batch size."""
         # Create games without openings
-        for i in range(5):
-            GameFactory(opening=None, moves="1. d4", source_id=f"batch-test-{i}")
+        Game.objects.bulk_create(
+            GameFactory.build(opening=None, moves="1. d4", source_id=f"batch-test-{i}")
+            for i in range(5)
+        )
 
         out = StringIO()
-        call_command("detect_openings", "--batch-size", "2", stdout=out)
+        # Queries grow with the number of batches, never with the games:
+        # three pages of at most 2 games plus the empty page ending the loop.
+        with django_assert_num_queries(8):
+            call_command("detect_openings", "--batch-size", "2", stdout=out)
 
         assert "Batch size: 2" in out.getvalue()
 
-    def test_detect_reports_statistics(self):
+    def test_detect_reports_statistics(self, sample_opening: Opening):
         """Detect reports processing statistics."""
         GameFactory(opening=None, moves="1. e4")
-        Opening.objects.create(
-            fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
-            eco_code="B00",
-            name="King's Pawn Game",
-            moves="1. e4",
-            ply_count=1,
-        )
 
         out = StringIO()
         call_command("detect_openings", stdout=out)
@@ -290,48 +295,145 @@ class TestDetectOpeningsCommand:
         out = StringIO()
         call_command("detect_openings", stdout=out)
 
-        game = Game.objects.first()
+        game = Game.objects.select_related("opening").only("opening").first()
         assert game.opening is None
         assert "updated 0 with openings" in out.getvalue()
 
+    def test_detect_with_workers(self, sample_opening: Opening):
+        """Detect with a worker pool assigns the same openings."""
+        for i in range(3):
+            GameFactory(opening=None, moves="1. e4 e5", source_id=f"workers-{i}")
+        GameFactory(opening=None, moves="1. d4", source_id="workers-none")
+
+        out = StringIO()
+        with patch(
+            "chess_core.management.commands.detect_openings.OpeningDetector",
+            wraps=OpeningDetector,
+        ) as mock_detector_cls:
+            call_command("detect_openings", "--workers", "2", stdout=out)
+
+        assert Game.objects.filter(opening__eco_code="B00").count() == 3
+        assert "updated 3 with openings" in out.getvalue()
+        # Only the forked workers build detectors; the parent process doesn't.
+        mock_detector_cls.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestBackfillMoveCountCommand:
+    """Tests for backfill_move_count management command."""
+
+    def test_backfill_sets_missing_move_counts(self):
+        """Games without move_count_ply get their half-move count."""
+        GameFactory(move_count_ply=None, moves="1. e4 e5 2. Nf3 Nc6 3. Bb5 1-0")
+        GameFactory(move_count_ply=99, moves="1. d4")
+
+        out = StringIO()
+        call_command("backfill_move_count", "--batch-size", "1", stdout=out)
+
+        counts = sorted(Game.objects.values_list("move_count_ply", flat=True))
+        assert counts == [5, 99]
+        assert "Games updated: 1" in out.getvalue()
+
+    def test_backfill_force_recounts_all(self):
+        """--force recounts games that already have a move count."""
+        GameFactory(move_count_ply=99, moves="1. d4 d5")
+
+        call_command("backfill_move_count", "--force", stdout=StringIO())
+
+        assert Game.objects.get().move_count_ply == 2
+
+    @pytest.mark.parametrize(
+        ("moves", "expected"),
+        [("1. e4 {good} e5", 3), ("1. e4 e5 $1 2. Nf3", 4), ("1... e5 2. Nf3 *", 2)],
+    )
+    def test_backfill_counts_like_import(self, moves: str, expected: int):
+        """Backfilled counts use the same rule as the import (count_plies)."""
+        GameFactory(move_count_ply=None, moves=moves)
+
+        call_command("backfill_move_count", stdout=StringIO())
+
+        assert Game.objects.get().move_count_ply == count_plies(moves) == expected
+
+    @pytest.mark.postgresql
+    def test_backfill_in_database_batches_and_skips_uncounted(self):
+        """The PostgreSQL path pages by id and leaves zero-move games alone."""
+        counted = GameFactory(move_count_ply=99, moves="1. e4 e5 2. Nf3 1-0")
+        empty = GameFactory(move_count_ply=7, moves="")
+        result_only = GameFactory(move_count_ply=8, moves="1-0")
+
+        out = StringIO()
+        call_command("backfill_move_count", "--force", "--batch-size", "1", stdout=out)
+
+        counted.refresh_from_db()
+        empty.refresh_from_db()
+        result_only.refresh_from_db()
+        assert (counted.move_count_ply, empty.move_count_ply) == (3, 7)
+        assert result_only.move_count_ply == 8
+        assert "Processed 3/3 games" in out.getvalue()
+        assert "Games updated: 1" in out.getvalue()
+
+    @pytest.mark.postgresql
+    @pytest.mark.parametrize(
+        "moves",
+        ["1. e4 e5 2. Nf3 Nc6 1-0", "1... e5 2. Nf3 *", "1.e4 e5", "12.", "  ", ""],
+    )
+    def test_move_count_sql_matches_count_plies(self, moves: str):
+        """MOVE_COUNT_PLY_SQL gives the count_plies result, NULL included."""
+        GameFactory(moves=moves)
+
+        counted = Game.objects.annotate(
+            counted_ply=RawSQL(MOVE_COUNT_PLY_SQL, ())
+        ).get()
+
+        assert counted.counted_ply == count_plies(moves)
+
+
+@pytest.mark.django_db
+class TestBackfillEndgameCommand:
+    """Tests for backfill_endgame management command."""
+
+    def test_backfill_sets_endgame_fields(self):
+        """Detected endgame ply and FEN are written to the game."""
+        game = GameFactory(endgame_move_ply=None, endgame_fen=None)
+        entry = EndgameEntry(fen="8/8/8/8/8/8/8/K6k w - - 0 40", ply=78)
+
+        with patch(
+            "chess_core.management.commands.backfill_endgame.EndgameDetector"
+        ) as mock_detector_cls:
+            mock_detector_cls.return_value.detect_endgame.return_value = entry
+            out = StringIO()
+            call_command("backfill_endgame", stdout=out)
+
+        game.refresh_from_db()
+        assert game.endgame_move_ply == 78
+        assert game.endgame_fen == entry.fen
+        assert "Games updated: 1" in out.getvalue()
+
 
 @pytest.mark.django_db
 class TestCommandIntegration:
     """Integration tests combining multiple commands."""
 
-    def test_load_then_import_with_detection(self, sample_pgn_content: str):
+    def test_load_then_import_with_detection(
+        self, loaded_openings: str, temp_pgn_file: Path
+    ):
         """Load openings, then import games with detection."""
-        # Step 1: Load openings
-        call_command("load_openings", stdout=StringIO())
-        opening_count = Opening.objects.count()
-        assert opening_count > 0
-
-        # Step 2: Import games (should detect openings)
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(sample_pgn_content)
-            path = f.name
+        assert Opening.objects.count() > 0
 
-        call_command("import_games", path, stdout=StringIO())
+        call_command("import_games", temp_pgn_file, stdout=StringIO())
 
         # Game should have opening detected
-        game = Game.objects.first()
+        game = Game.objects.select_related("opening").only("opening").first()
         assert game.opening is not None
 
-    def test_import_then_backfill(self, sample_pgn_content: str):
-        """Import games first, then backfill openings."""
-        # Step 1: Import without openings in database
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(sample_pgn_content)
-            path = f.name
-
-        call_command("import_games", path, stdout=StringIO())
-        game = Game.objects.first()
-        assert game.opening is None  # No openings in DB
-
-        # Step 2: Load openings
-        call_command("load_openings", stdout=StringIO())
+    def test_import_then_backfill(self, loaded_openings: str, temp_pgn_file: Path):
+        """Games imported without an opening get one from the backfill."""
+        call_command("import_games", temp_pgn_file, stdout=StringIO())
+        # Stand in for games imported before the openings were loaded
+        Game.objects.update(opening=None)
+        game = Game.objects.select_related("opening").only("opening").first()
+        assert game.opening is None
 
-        # Step 3: Backfill
         call_command("detect_openings", stdout=StringIO())
 
         game.refresh_from_db()
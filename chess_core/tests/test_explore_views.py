@@ -3,12 +3,15 @@
 import json
 import re
 from datetime import date
+from unittest.mock import patch
 
 import pytest
 from django.test import Client
 
 from chess_core.models import Opening
+from chess_core.services.opening_stats import OpeningStatsFilterParams
 from chess_core.tests.factories import GameFactory, OpeningFactory
+from chess_core.views import _build_pagination, _get_chart_params_from_request
 
 
 @pytest.fixture
@@ -142,3 +145,95 @@ def test_explore_chart_respects_opening_threshold(client: Client, db: None) -> N
     )
     assert response_high.status_code == 200
     assert b"No data for the selected filters." in response_high.content
+
+
+def test_explore_chart_cached_across_sort_and_page(client: Client, db: None) -> None:
+    """Sorting and paging reuse the cached chart; filter changes do not."""
+    with patch(
+        "chess_core.views.get_win_rate_over_time", return_value=[]
+    ) as mock_chart:
+        client.get("/explore/", {"sort_by": "name"}, HTTP_HX_REQUEST="true")
+        client.get(
+            "/explore/", {"sort_by": "eco_code", "page": "2"}, HTTP_HX_REQUEST="true"
+        )
+        assert mock_chart.call_count == 1
+
+        client.get("/explore/", {"eco_code": "B20"}, HTTP_HX_REQUEST="true")
+        assert mock_chart.call_count == 2
+
+
+def test_explore_table_target_skips_chart(
+    client: Client, opening_with_games: Opening
+) -> None:
+    """Sort/page requests aimed at the stats table render only the table."""
+    with patch("chess_core.views.get_win_rate_over_time") as mock_chart:
+        response = client.get(
+            "/explore/",
+            {"sort_by": "name", "threshold": "1", "opening_threshold": "1"},
+            HTTP_HX_REQUEST="true",
+            HTTP_HX_TARGET="opening-stats-results",
+        )
+    assert response.status_code == 200
+    assert b"Sicilian Defense" in response.content
+    assert b"win-rate-chart-wrapper" not in response.content
+    mock_chart.assert_not_called()
+
+
+def test_chart_params_parsed_from_explorer_form() -> None:
+    """chart_period and threshold map onto the chart filter params."""
+    params = _get_chart_params_from_request(
+        {
+            "chart_period": "month",
+            "date_from": "2024-01-01",
+            "eco_code": "B20",
+            "threshold": "5",
+            "opening_threshold": "3",
+        }
+    )
+    assert params.period == "month"
+    assert params.date_from == date(2024, 1, 1)
+    assert params.date_to is None
+    assert params.eco_code == "B20"
+    assert params.opening_name is None
+    assert params.min_games == 5
+    assert params.opening_threshold == 3
+
+
+def test_chart_params_invalid_values_fall_back() -> None:
+    """Blank or invalid chart inputs use the defaults instead of failing."""
+    params = _get_chart_params_from_request(
+        {
+            "chart_period": "decade",
+            "date_from": "not-a-date",
+            "eco_code": "",
+            "threshold": "-2",
+            "opening_threshold": "abc",
+        }
+    )
+    assert params.period == "week"
+    assert params.date_from is None
+    assert params.eco_code is None
+    assert params.min_games == 1
+    assert params.opening_threshold is None
+
+
+def test_explore_invalid_page_does_not_error(
+    client: Client, db: None, opening_with_games: Opening
+) -> None:
+    """A non-numeric page falls back to the first page instead of a 500."""
+    response = client.get("/explore/", {"page": "abc", "page_size": "x"})
+    assert response.status_code == 200
+    assert b"Sicilian Defense" in response.content
+
+
+def test_build_pagination_links_and_clamping() -> None:
+    """Pages are clamped to the total and links change only the page key."""
+    pagination = _build_pagination(
+        {"eco_code": "B20", "page": "9"},
+        25,
+        OpeningStatsFilterParams(page=9, page_size=10),
+    )
+    assert pagination["page"] == 3
+    assert pagination["total_pages"] == 3
+    assert pagination["prev_url"] == "?eco_code=B20&page=2"
+    assert pagination["next_url"] is None
@@ -7,6 +7,7 @@ from django.test import Client
 
 from chess_core.services.latest_game import get_latest_game_for_opening
 from chess_core.tests.factories import GameFactory, OpeningFactory
+from chess_core.views import _parse_moves_to_table
 
 
 @pytest.mark.django_db
@@ -53,6 +54,16 @@ class TestGetLatestGameForOpening:
         assert result.id == latest.id
         assert result.white_player == "Latest"
 
+    def test_fields_limits_loaded_columns(self, db: None) -> None:
+        """fields defers every other Game column."""
+        opening = OpeningFactory()
+        GameFactory(opening=opening, moves="1. e4 e5")
+
+        game = get_latest_game_for_opening(opening.id, fields=("moves",))
+
+        assert game.moves == "1. e4 e5"
+        assert "raw_headers" in game.get_deferred_fields()
+
     def test_null_date_sorts_last(self, db: None) -> None:
         """Game with date is preferred over game with null date."""
         opening = OpeningFactory()
@@ -81,9 +92,7 @@ class TestLatestGameAPI:
     def api_client(self) -> Client:
         return Client()
 
-    def test_200_returns_latest_game_schema(
-        self, api_client: Client, db: None
-    ) -> None:
+    def test_200_returns_latest_game_schema(self, api_client: Client, db: None) -> None:
         """Valid opening with game returns 200 and LatestGameSchema fields."""
         opening = OpeningFactory(eco_code="B20", name="Sicilian")
         GameFactory(
@@ -105,17 +114,13 @@ class TestLatestGameAPI:
         assert "date" in data
         assert "moves" in data
 
-    def test_404_when_opening_has_no_games(
-        self, api_client: Client, db: None
-    ) -> None:
+    def test_404_when_opening_has_no_games(self, api_client: Client, db: None) -> None:
         """Opening with no games returns 404."""
         opening = OpeningFactory()
         response = api_client.get(f"/api/v1/openings/{opening.id}/latest-game/")
         assert response.status_code == 404
 
-    def test_404_when_opening_id_invalid(
-        self, api_client: Client, db: None
-    ) -> None:
+    def test_404_when_opening_id_invalid(self, api_client: Client, db: None) -> None:
         """Invalid opening_id returns 404."""
         response = api_client.get("/api/v1/openings/99999/latest-game/")
         assert response.status_code == 404
@@ -129,9 +134,7 @@ class TestLatestGameView:
     def client(self) -> Client:
         return Client()
 
-    def test_htmx_returns_partial_with_game(
-        self, client: Client, db: None
-    ) -> None:
+    def test_htmx_returns_partial_with_game(self, client: Client, db: None) -> None:
         """HX-Request returns partial containing game info."""
         opening = OpeningFactory(eco_code="B33", name="Sicilian")
         GameFactory(
@@ -151,9 +154,7 @@ class TestLatestGameView:
         assert "1/2-1/2" in content
         assert "<html" not in content.lower()
 
-    def test_htmx_returns_partial_no_games(
-        self, client: Client, db: None
-    ) -> None:
+    def test_htmx_returns_partial_no_games(self, client: Client, db: None) -> None:
         """HX-Request with opening that has no games returns partial message."""
         opening = OpeningFactory()
         response = client.get(
@@ -163,9 +164,7 @@ class TestLatestGameView:
         assert response.status_code == 200
         assert b"No games for this opening" in response.content
 
-    def test_full_page_returns_html_with_game(
-        self, client: Client, db: None
-    ) -> None:
+    def test_full_page_returns_html_with_game(self, client: Client, db: None) -> None:
         """Without HX-Request returns full page with game."""
         opening = OpeningFactory(name="French Defense")
         GameFactory(opening=opening, white_player="W", black_player="B")
@@ -180,3 +179,37 @@ class TestLatestGameView:
         """Invalid opening_id returns 404."""
         response = client.get("/openings/99999/latest-game/")
         assert response.status_code == 404
+
+
+class TestParseMovesToTable:
+    """Tests for _parse_moves_to_table move-table rows."""
+
+    def test_empty_moves(self) -> None:
+        """Empty or blank move text yields no rows."""
+        assert _parse_moves_to_table("") == []
+        assert _parse_moves_to_table("   ") == []
+
+    def test_pairs_moves_and_drops_result(self) -> None:
+        """Moves are paired per number and the result token is dropped."""
+        rows = _parse_moves_to_table("1. e4 e5 2. Nf3\nNc6 3. Bb5 1-0")
+        assert rows == [
+            {"num": 1, "white": "e4", "black": "e5"},
+            {"num": 2, "white": "Nf3", "black": "Nc6"},
+            {"num": 3, "white": "Bb5", "black": ""},
+        ]
+
+    def test_move_number_without_space(self) -> None:
+        """Move numbers attached to the move ("1.e4") are split off."""
+        rows = _parse_moves_to_table("1.e4 c5 2.Nf3 1/2-1/2")
+        assert rows == [
+            {"num": 1, "white": "e4", "black": "c5"},
+            {"num": 2, "white": "Nf3", "black": ""},
+        ]
+
+    def test_black_to_move_continuation(self) -> None:
+        """A "1..." move number leaves "..." in the white column."""
+        rows = _parse_moves_to_table("1... e5 2. Nf3 *")
+        assert rows == [
+            {"num": 1, "white": "...", "black": "e5"},
+            {"num": 2, "white": "Nf3", "black": ""},
+        ]
@@ -7,6 +7,7 @@ from django.db import IntegrityError
 
 from chess_core.models import Game, Opening
 
+from .constants import FEN_AFTER_E4
 from .factories import GameFactory, OpeningFactory
 
 
@@ -21,7 +22,7 @@ class TestOpeningModel:
 
     def test_fen_unique_constraint(self):
         """Duplicate FEN raises IntegrityError."""
-        fen = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+        fen = FEN_AFTER_E4
         OpeningFactory(fen=fen)
         with pytest.raises(IntegrityError):
             OpeningFactory(fen=fen)
@@ -49,14 +50,14 @@ class TestOpeningModel:
         assert opening.source == ""
         assert opening.is_eco_root is False
 
-    def test_eco_code_indexed(self):
-        """eco_code field is indexed."""
-        # Verify the index exists by checking model meta
-        assert any("eco_code" in str(idx.fields) for idx in Opening._meta.indexes)
 
-    def test_name_indexed(self):
-        """name field is indexed."""
-        assert any("name" in str(idx.fields) for idx in Opening._meta.indexes)
+class TestOpeningMeta:
+    """Tests for Opening model metadata; no database access."""
+
+    @pytest.mark.parametrize("field_name", ["eco_code", "name"])
+    def test_field_indexed(self, field_name: str):
+        """Fields filtered on by the explorer have an index."""
+        assert any(field_name in idx.fields for idx in Opening._meta.indexes)
 
 
 @pytest.mark.django_db
@@ -165,8 +166,8 @@ class TestGameModel:
         """raw_headers stores JSON data correctly."""
         headers = {"Event": "Test", "Custom": "Value"}
         game = GameFactory(raw_headers=headers)
-        game.refresh_from_db()
-        assert game.raw_headers == headers
+        stored = Game.objects.values_list("raw_headers", flat=True).get(pk=game.pk)
+        assert stored == headers
 
     def test_raw_headers_default_empty_dict(self):
         """raw_headers defaults to empty dict."""
@@ -185,25 +186,16 @@ class TestGameModel:
         game = GameFactory()
         assert game.created_at is not None
 
-    def test_source_id_indexed(self):
-        """source_id field is indexed."""
-        field = Game._meta.get_field("source_id")
-        assert field.db_index is True
-
-    def test_date_indexed(self):
-        """date field is indexed."""
-        field = Game._meta.get_field("date")
-        assert field.db_index is True
 
-    def test_white_player_indexed(self):
-        """white_player field is indexed."""
-        field = Game._meta.get_field("white_player")
-        assert field.db_index is True
+class TestGameMeta:
+    """Tests for Game model metadata; no database access."""
 
-    def test_black_player_indexed(self):
-        """black_player field is indexed."""
-        field = Game._meta.get_field("black_player")
-        assert field.db_index is True
+    @pytest.mark.parametrize(
+        "field_name", ["source_id", "date", "white_player", "black_player"]
+    )
+    def test_field_indexed(self, field_name: str):
+        """Fields filtered on by the explorer have db_index set."""
+        assert Game._meta.get_field(field_name).db_index is True
 
 
 @pytest.mark.django_db
@@ -228,6 +220,6 @@ class TestModelRelationships:
     def test_opening_game_count(self):
         """Can count games per opening."""
         opening = OpeningFactory()
-        GameFactory.create_batch(5, opening=opening)
+        Game.objects.bulk_create(GameFactory.build_batch(5, opening=opening))
 
         assert opening.game_set.count() == 5
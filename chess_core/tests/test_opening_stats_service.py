@@ -5,7 +5,10 @@ from datetime import date
 import pytest
 
 from chess_core.models import Game, Opening
-from chess_core.services.opening_stats import OpeningStatsFilterParams, OpeningStatsService
+from chess_core.services.opening_stats import (
+    OpeningStatsFilterParams,
+    OpeningStatsService,
+)
 from chess_core.tests.factories import GameFactory, OpeningFactory
 
 
@@ -138,9 +141,7 @@ class TestOpeningStatsServiceAggregation:
         assert len(results) == 2
 
         # Find Sicilian stats
-        sicilian_stats = next(
-            r for r in results if r["opening__eco_code"] == "B20"
-        )
+        sicilian_stats = next(r for r in results if r["opening__eco_code"] == "B20")
         assert sicilian_stats["opening__name"] == "Sicilian Defense"
 
     def test_counts_results_correctly(
@@ -152,9 +153,7 @@ class TestOpeningStatsServiceAggregation:
 
         results, _ = service.get_stats(filters)
 
-        sicilian_stats = next(
-            r for r in results if r["opening__eco_code"] == "B20"
-        )
+        sicilian_stats = next(r for r in results if r["opening__eco_code"] == "B20")
 
         assert sicilian_stats["game_count"] == 6
         assert sicilian_stats["white_wins"] == 3
@@ -170,14 +169,23 @@ class TestOpeningStatsServiceAggregation:
 
         results, _ = service.get_stats(filters)
 
-        sicilian_stats = next(
-            r for r in results if r["opening__eco_code"] == "B20"
-        )
+        sicilian_stats = next(r for r in results if r["opening__eco_code"] == "B20")
 
         # Sicilian ply counts: 40, 41, 42, 50, 51, 35 = 259 / 6 / 2 = 21.583...
         expected_avg = (40 + 41 + 42 + 50 + 51 + 35) / 6 / 2
         assert abs(sicilian_stats["avg_moves"] - expected_avg) < 0.01
 
+    def test_average_moves_rounded_in_query(
+        self, games_with_openings: list[Game], opening_sicilian: Opening
+    ):
+        """avg_moves comes back from the database rounded to two decimals."""
+        service = OpeningStatsService()
+
+        results, _ = service.get_stats(OpeningStatsFilterParams())
+
+        sicilian_stats = next(r for r in results if r["opening__eco_code"] == "B20")
+        assert sicilian_stats["avg_moves"] == 21.58
+
     def test_excludes_games_without_opening(self, db, opening_sicilian: Opening):
         """Games with null opening are excluded from stats."""
         # Create game with opening
@@ -203,9 +211,7 @@ class TestOpeningStatsServiceAggregation:
 
         assert len(results) == 0
 
-    def test_orders_by_game_count_descending(
-        self, games_with_openings: list[Game]
-    ):
+    def test_orders_by_game_count_descending(self, games_with_openings: list[Game]):
         """Results are ordered by game_count descending."""
         service = OpeningStatsService()
         filters = OpeningStatsFilterParams()
@@ -396,6 +402,35 @@ class TestOpeningStatsServiceDateFilters:
         assert results[0]["game_count"] == 1
         assert results[0]["black_wins"] == 1
 
+    def test_filter_date_upper_bound_inclusive(self, db, opening_sicilian: Opening):
+        """Games on date_to are included; the next day is not."""
+        GameFactory(opening=opening_sicilian, date=date(2024, 9, 30), result="1-0")
+        GameFactory(opening=opening_sicilian, date=date(2024, 10, 1), result="0-1")
+
+        service = OpeningStatsService()
+        filters = OpeningStatsFilterParams(
+            date_from=date(2024, 9, 1),
+            date_to=date(2024, 9, 30),
+        )
+
+        results, _ = service.get_stats(filters)
+
+        assert len(results) == 1
+        assert results[0]["game_count"] == 1
+        assert results[0]["white_wins"] == 1
+
+    def test_filter_max_date_to(self, db, opening_sicilian: Opening):
+        """date_to on the last representable day keeps every game."""
+        GameFactory(opening=opening_sicilian, date=date(2024, 9, 30), result="1-0")
+
+        service = OpeningStatsService()
+        filters = OpeningStatsFilterParams(date_to=date.max)
+
+        results, _ = service.get_stats(filters)
+
+        assert len(results) == 1
+        assert results[0]["game_count"] == 1
+
 
 @pytest.mark.django_db
 class TestOpeningStatsServiceEloFilters:
@@ -573,9 +608,7 @@ class TestOpeningStatsServiceThreshold:
 
         assert len(results) == 2
 
-    def test_threshold_zero_includes_all(
-        self, db, opening_sicilian: Opening
-    ):
+    def test_threshold_zero_includes_all(self, db, opening_sicilian: Opening):
         """Threshold of 0 includes all openings."""
         GameFactory(opening=opening_sicilian, result="1-0", move_count_ply=40)
 
@@ -585,3 +618,25 @@ class TestOpeningStatsServiceThreshold:
         results, _ = service.get_stats(filters)
 
         assert len(results) == 1
+
+    def test_total_count_spans_pages_and_respects_threshold(
+        self,
+        db,
+        opening_sicilian: Opening,
+        opening_french: Opening,
+        opening_caro_kann: Opening,
+    ):
+        """total_count counts every qualifying opening, not just the page."""
+        for _ in range(3):
+            GameFactory(opening=opening_sicilian, result="1-0", move_count_ply=40)
+        for _ in range(2):
+            GameFactory(opening=opening_french, result="1-0", move_count_ply=35)
+        GameFactory(opening=opening_caro_kann, result="1-0", move_count_ply=30)
+
+        service = OpeningStatsService()
+        filters = OpeningStatsFilterParams(threshold=2, page_size=1)
+
+        results, total_count = service.get_stats(filters)
+
+        assert len(results) == 1
+        assert total_count == 2
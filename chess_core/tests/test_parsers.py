@@ -1,11 +1,16 @@
 """Tests for PGN parser."""
 
-import tempfile
+import bz2
+import gzip
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 
 import pytest
 
+from chess_core.parsers import pgn as pgn_module
 from chess_core.parsers.base import GameData
 from chess_core.parsers.pgn import PGNParser
 
@@ -18,6 +23,72 @@ class TestPGNParserInit:
         parser = PGNParser()
         assert parser is not None
 
+    def test_init_default_chunk_size(self):
+        """Parser reads files in 1 MiB chunks by default."""
+        parser = PGNParser()
+        assert parser._chunk_size == 1 << 20
+
+    def test_parse_with_small_chunk_size(self, temp_multi_game_pgn_file: Path):
+        """A chunk size smaller than a game still parses every game."""
+        parser = PGNParser(chunk_size=16)
+        games = list(parser.parse(temp_multi_game_pgn_file))
+
+        assert len(games) == 3
+
+    def test_parse_with_workers_preserves_order(self, temp_multi_game_pgn_file: Path):
+        """Parallel parsing yields the same games in file order."""
+        serial = list(PGNParser().parse(temp_multi_game_pgn_file))
+        parallel = list(PGNParser(workers=2).parse(temp_multi_game_pgn_file))
+
+        assert [g.source_id for g in parallel] == [g.source_id for g in serial]
+        assert [g.white_player for g in parallel] == ["White1", "White2", "White3"]
+
+    def test_parse_with_workers_small_slices(
+        self, temp_multi_game_pgn_file: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Slices smaller than a game split at every game boundary."""
+        monkeypatch.setattr(pgn_module, "SLICE_BYTES", 1)
+        ranges = pgn_module._game_ranges(temp_multi_game_pgn_file, 1)
+        parallel = list(PGNParser(workers=2).parse(temp_multi_game_pgn_file))
+
+        assert len(ranges) == 3
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == temp_multi_game_pgn_file.stat().st_size
+        assert [g.white_player for g in parallel] == ["White1", "White2", "White3"]
+
+    def test_parse_with_workers_bounds_slices_in_flight(
+        self, temp_multi_game_pgn_file: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Slices are submitted as earlier ones are consumed, not all at once."""
+        submitted = []
+
+        class RecordingPool(ThreadPoolExecutor):
+            def submit(self, fn, *args):
+                submitted.append(args[-1])
+                return super().submit(fn, *args)
+
+        monkeypatch.setattr(pgn_module, "SLICE_BYTES", 1)
+        monkeypatch.setattr(pgn_module, "SLICES_IN_FLIGHT_PER_WORKER", 1)
+        monkeypatch.setattr(pgn_module, "ProcessPoolExecutor", RecordingPool)
+        games = PGNParser(workers=2).parse(temp_multi_game_pgn_file)
+
+        assert next(games).white_player == "White1"
+        assert len(submitted) == 2
+        assert [g.white_player for g in games] == ["White2", "White3"]
+        assert len(submitted) == 3
+
+    def test_workers_reject_unpicklable_header_filter(self):
+        """A lambda header_filter cannot be sent to worker processes."""
+        with pytest.raises(ValueError, match="picklable"):
+            PGNParser(workers=2, header_filter=lambda h: True)
+
+    def test_parse_with_workers_empty_file(self, tmp_path: Path):
+        """Parallel parsing of an empty file yields no games."""
+        path = tmp_path / "empty.pgn"
+        path.write_text("")
+
+        assert list(PGNParser(workers=2).parse(path)) == []
+
 
 class TestPGNParserParse:
     """Tests for PGNParser.parse method."""
@@ -51,12 +122,8 @@ class TestPGNParserParse:
 
     def test_parse_empty_file(self):
         """Parse empty PGN file returns no games."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write("")
-            path = Path(f.name)
-
         parser = PGNParser()
-        games = list(parser.parse(path))
+        games = list(parser.parse_stream(io.StringIO("")))
 
         assert len(games) == 0
 
@@ -85,7 +152,7 @@ class TestPGNParserParse:
         assert game.termination == "Normal"
         assert "e4" in game.moves
         assert game.source_format == "pgn"
-        assert "Event" in game.raw_headers
+        assert "Date" in game.raw_headers
 
     def test_parse_with_path_string(self, temp_pgn_file: Path):
         """Parser accepts string path."""
@@ -94,6 +161,29 @@ class TestPGNParserParse:
 
         assert len(games) == 1
 
+    def test_parse_with_stream(self, sample_pgn_content: str):
+        """parse() accepts an open text stream."""
+        parser = PGNParser()
+        games = list(parser.parse(io.StringIO(sample_pgn_content)))
+
+        assert len(games) == 1
+        assert games[0].white_player == "Player One"
+
+    @pytest.mark.parametrize("suffix, opener", [(".bz2", bz2.open), (".gz", gzip.open)])
+    def test_parse_compressed_file(
+        self, tmp_path: Path, sample_pgn_content: str, suffix, opener
+    ):
+        """Compressed PGN files are decompressed while parsing."""
+        path = tmp_path / f"games.pgn{suffix}"
+        with opener(path, "wt", encoding="utf-8") as f:
+            f.write(sample_pgn_content)
+
+        parser = PGNParser()
+        games = list(parser.parse(path))
+
+        assert len(games) == 1
+        assert games[0].white_player == "Player One"
+
 
 class TestPGNParserDateParsing:
     """Tests for date parsing in PGNParser."""
@@ -146,6 +236,22 @@ class TestPGNParserDateParsing:
         result = parser._parse_date("2024.13.45")  # Invalid month/day
         assert result is None
 
+    def test_parse_date_unknown_year_known_month(self):
+        """Parse date with unknown year but known month/day returns None."""
+        parser = PGNParser()
+        result = parser._parse_date("????.01.15")
+        assert result is None
+
+    def test_parse_date_is_cached(self):
+        """Repeated date strings are served from the parse cache."""
+        parser = PGNParser()
+        pgn_module._parse_date.cache_clear()
+
+        parser._parse_date("2024.01.15")
+        parser._parse_date("2024.01.15")
+
+        assert pgn_module._parse_date.cache_info().hits == 1
+
 
 class TestPGNParserEloParsing:
     """Tests for Elo parsing in PGNParser."""
@@ -185,6 +291,22 @@ class TestPGNParserEloParsing:
         parser = PGNParser()
         assert parser._parse_int("2800.5") is None
 
+    def test_parse_int_signed(self):
+        """Parse explicitly signed integer strings."""
+        parser = PGNParser()
+        assert parser._parse_int("+15") == 15
+        assert parser._parse_int("-15") == -15
+
+    def test_parse_int_is_cached(self):
+        """Repeated integer strings are served from the parse cache."""
+        parser = PGNParser()
+        pgn_module._parse_int.cache_clear()
+
+        parser._parse_int("2500")
+        parser._parse_int("2500")
+
+        assert pgn_module._parse_int.cache_info().hits == 1
+
 
 class TestPGNParserSourceIdGeneration:
     """Tests for source ID generation."""
@@ -213,6 +335,14 @@ class TestPGNParserSourceIdGeneration:
         assert len(game.source_id) == 64  # SHA-256 truncated
         assert all(c in "0123456789abcdef" for c in game.source_id)
 
+    def test_source_id_digest_is_stable(self, temp_pgn_file: Path):
+        """source_id stays the SHA-256 of the key headers so re-imports dedup."""
+        parser = PGNParser()
+        game = next(parser.parse(temp_pgn_file))
+
+        key = "Test Event|Test Site|2024.01.15|1|Player One|Player Two|1-0|"
+        assert game.source_id == hashlib.sha256(key.encode()).hexdigest()
+
 
 class TestPGNParserMissingHeaders:
     """Tests for handling missing headers."""
@@ -225,12 +355,8 @@ class TestPGNParserMissingHeaders:
 
 1. e4 1-0
 """
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(pgn)
-            path = Path(f.name)
-
         parser = PGNParser()
-        game = list(parser.parse(path))[0]
+        game = list(parser.parse_stream(io.StringIO(pgn)))[0]
 
         # python-chess returns "?" for missing required headers
         assert game.white_player == "?"
@@ -243,12 +369,8 @@ class TestPGNParserMissingHeaders:
 
 1. e4 1-0
 """
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(pgn)
-            path = Path(f.name)
-
         parser = PGNParser()
-        game = list(parser.parse(path))[0]
+        game = list(parser.parse_stream(io.StringIO(pgn)))[0]
 
         # python-chess returns "?" for missing required headers
         assert game.black_player == "?"
@@ -261,23 +383,15 @@ class TestPGNParserMissingHeaders:
 
 1. e4 e5
 """
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(pgn)
-            path = Path(f.name)
-
         parser = PGNParser()
-        game = list(parser.parse(path))[0]
+        game = list(parser.parse_stream(io.StringIO(pgn)))[0]
 
         assert game.result == "*"
 
     def test_parse_missing_optional_headers(self, pgn_with_missing_headers: str):
         """Missing optional headers default correctly."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(pgn_with_missing_headers)
-            path = Path(f.name)
-
         parser = PGNParser()
-        game = list(parser.parse(path))[0]
+        game = list(parser.parse_stream(io.StringIO(pgn_with_missing_headers)))[0]
 
         # python-chess returns "?" for missing standard headers
         assert game.event == "?"
@@ -312,12 +426,8 @@ class TestPGNParserMoveExtraction:
 
 1. e4 e5 (1... c5 2. Nf3) 2. Nf3 Nc6 1-0
 """
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".pgn", delete=False) as f:
-            f.write(pgn)
-            path = Path(f.name)
-
         parser = PGNParser()
-        game = list(parser.parse(path))[0]
+        game = list(parser.parse_stream(io.StringIO(pgn)))[0]
 
         # Main line should be present
         assert "e4" in game.moves
@@ -325,21 +435,49 @@ class TestPGNParserMoveExtraction:
         # Variation (c5) should not be present
         assert "c5" not in game.moves
 
+    def test_extract_moves_no_comments_or_nags(self):
+        """Comments and NAGs are stripped and SAN is canonicalized."""
+        pgn = """[Event "Test"]
+[White "White"]
+[Black "Black"]
+[Result "1-0"]
+
+1. e4 {best by test} e5 $1 2. Ngf3 Nc6 3. Bc4 Nf6 4. 0-0 1-0
+"""
+        parser = PGNParser()
+        game = next(parser.parse_stream(io.StringIO(pgn)))
+
+        assert "{" not in game.moves
+        assert "$" not in game.moves
+        assert "2. Nf3" in game.moves
+        assert "4. O-O" in game.moves
+
 
 class TestPGNParserRawHeaders:
     """Tests for raw headers preservation."""
 
     def test_raw_headers_preserved(self, temp_pgn_file: Path):
-        """All original headers are preserved in raw_headers."""
+        """Headers without a verbatim field of their own are preserved."""
         parser = PGNParser()
         game = list(parser.parse(temp_pgn_file))[0]
 
-        assert game.raw_headers["Event"] == "Test Event"
-        assert game.raw_headers["Site"] == "Test Site"
-        assert game.raw_headers["White"] == "Player One"
-        assert game.raw_headers["Black"] == "Player Two"
-        assert game.raw_headers["WhiteElo"] == "2500"
-        assert game.raw_headers["BlackElo"] == "2400"
+        assert game.raw_headers == {
+            "Date": "2024.01.15",
+            "WhiteElo": "2500",
+            "BlackElo": "2400",
+        }
+
+    def test_raw_headers_keep_novel_headers(self):
+        """Headers the parser does not extract are kept verbatim."""
+        pgn = io.StringIO(
+            '[Event "E"]\n[White "A"]\n[Black "B"]\n[Result "1-0"]\n'
+            '[ECO "C20"]\n[Annotator "X"]\n\n1. e4 1-0\n'
+        )
+        game = next(PGNParser().parse(pgn))
+
+        assert game.raw_headers["ECO"] == "C20"
+        assert game.raw_headers["Annotator"] == "X"
+        assert "Event" not in game.raw_headers
 
     def test_raw_headers_is_dict(self, temp_pgn_file: Path):
         """raw_headers is a proper dict."""
@@ -347,3 +485,122 @@ class TestPGNParserRawHeaders:
         game = list(parser.parse(temp_pgn_file))[0]
 
         assert isinstance(game.raw_headers, dict)
+
+    def test_raw_headers_not_captured(self, temp_pgn_file: Path):
+        """capture_raw=False leaves raw_headers empty."""
+        parser = PGNParser(capture_raw=False)
+        game = next(parser.parse(temp_pgn_file))
+
+        assert game.raw_headers == {}
+        assert game.event == "Test Event"
+
+
+class TestPGNParserHeaderFilter:
+    """Tests for skipping games with a header filter."""
+
+    def test_header_filter_skips_rejected_games(self, temp_multi_game_pgn_file: Path):
+        """Only games accepted by the header filter are yielded."""
+        parser = PGNParser(header_filter=lambda h: h.get("White") != "White2")
+        games = list(parser.parse(temp_multi_game_pgn_file))
+
+        assert [g.white_player for g in games] == ["White1", "White3"]
+
+    def test_header_filter_rejects_all(self, temp_multi_game_pgn_file: Path):
+        """A filter rejecting every game yields nothing."""
+        parser = PGNParser(header_filter=lambda h: False)
+
+        assert list(parser.parse(temp_multi_game_pgn_file)) == []
+
+
+class TestPGNParserWithoutValidation:
+    """Tests for the lightweight scanner used when validate=False."""
+
+    def test_matches_validated_parse(self, temp_multi_game_pgn_file: Path):
+        """Canonical sources parse to the same games either way."""
+        validated = list(PGNParser().parse(temp_multi_game_pgn_file))
+        scanned = list(PGNParser(validate=False).parse(temp_multi_game_pgn_file))
+
+        assert [g.source_id for g in scanned] == [g.source_id for g in validated]
+        assert [g.moves for g in scanned] == [g.moves for g in validated]
+        assert [g.date for g in scanned] == [g.date for g in validated]
+
+    def test_strips_annotations_and_renumbers(self):
+        """Comments, variations, NAGs and glued move numbers are normalized."""
+        pgn = """[Event "Test"]
+[White "A \\"Ace\\""]
+[Result "1-0"]
+
+1.e4 {best (by) test} e5! (1... c5 (1... e6) 2. Nf3) 2.Nf3 $1 Nc6
+3. Bc4 Nf6 4. 0-0 ; rest of line
+Be7 1-0
+"""
+        game = next(PGNParser(validate=False).parse_stream(io.StringIO(pgn)))
+
+        assert game.white_player == 'A "Ace"'
+        assert game.moves == "1. e4 e5 2. Nf3 Nc6 3. Bc4 Nf6 4. O-O Be7 1-0"
+
+    def test_wrapped_comments_stay_in_movetext(self):
+        """Comment lines starting with "[" or blank do not split the game."""
+        pgn = """[Event "Wrapped"]
+[White "A"]
+[Result "1-0"]
+
+1. e4 { [%eval 0.3]
+[%clk 0:01:00]} e5 2. Nf3 {a long note
+
+that spans a blank line} Nc6 ; no { brace here
+3. Bb5 1-0
+
+[Event "Next"]
+[White "B"]
+[Result "*"]
+
+1. d4 *
+"""
+        games = list(PGNParser(validate=False).parse_stream(io.StringIO(pgn)))
+        validated = list(PGNParser().parse_stream(io.StringIO(pgn)))
+
+        assert [(g.event, g.moves) for g in games] == [
+            ("Wrapped", "1. e4 e5 2. Nf3 Nc6 3. Bb5 1-0"),
+            ("Next", "1. d4 *"),
+        ]
+        assert [g.moves for g in games] == [g.moves for g in validated]
+
+    def test_custom_start_position_numbering(self):
+        """A FEN tag sets the first move number and side to move."""
+        pgn = """[Event "Test"]
+[Result "*"]
+[FEN "4k3/8/8/8/8/8/8/4K3 b - - 0 12"]
+
+12... Kd7 13. Kd2 *
+"""
+        game = next(PGNParser(validate=False).parse_stream(io.StringIO(pgn)))
+
+        assert game.moves == "12... Kd7 13. Kd2 *"
+
+    def test_games_without_movetext(self):
+        """Header-only games are yielded separately."""
+        pgn = '[Event "A"]\n[Result "*"]\n\n[Event "B"]\n[Result "*"]\n\n1. e4 *\n'
+        games = list(PGNParser(validate=False).parse_stream(io.StringIO(pgn)))
+
+        assert [(g.event, g.moves) for g in games] == [("A", "*"), ("B", "1. e4 *")]
+
+    def test_header_filter_applies(self, temp_multi_game_pgn_file: Path):
+        """Games rejected by the header filter are skipped."""
+        parser = PGNParser(
+            validate=False, header_filter=lambda h: h.get("White") != "White2"
+        )
+        games = list(parser.parse(temp_multi_game_pgn_file))
+
+        assert [g.white_player for g in games] == ["White1", "White3"]
+
+
+class TestGameData:
+    """Tests for the GameData transfer object."""
+
+    def test_game_data_uses_slots(self, temp_pgn_file: Path):
+        """GameData instances have no per-instance __dict__."""
+        parser = PGNParser()
+        game = next(parser.parse(temp_pgn_file))
+
+        assert not hasattr(game, "__dict__")
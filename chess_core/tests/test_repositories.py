@@ -1,15 +1,20 @@
 """Tests for GameRepository."""
 
+import threading
 from datetime import date
 from unittest.mock import patch
 
 import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
-from chess_core.models import Game
+from chess_core.models import Game, Opening
 from chess_core.parsers.base import GameData
 from chess_core.repositories import GameRepository
-from chess_core.services import EndgameEntry
+from chess_core.services import EndgameEntry, GameAnalysis, opening_fen_to_id
 from chess_core.services.openings import OpeningMatch
+from chess_core.tests.constants import FEN_AFTER_E4_E5
 
 from .factories import GameFactory, OpeningFactory
 
@@ -56,7 +61,7 @@ class TestGameRepositoryInit:
     """Tests for GameRepository initialization."""
 
     def test_init_loads_opening_cache(self):
-        """Repository loads opening FEN cache on init."""
+        """Repository loads the opening FEN cache."""
         opening = OpeningFactory()
         repo = GameRepository()
 
@@ -78,6 +83,44 @@ class TestGameRepositoryInit:
             assert repo._opening_cache[opening.fen] == opening.id
 
 
+@pytest.mark.django_db
+class TestGameRepositorySharedOpeningCache:
+    """Tests for the opening cache shared between repositories."""
+
+    def test_cache_shared_between_instances(self):
+        """A second repository reuses the loaded mapping."""
+        OpeningFactory()
+        first = GameRepository()
+        second = GameRepository()
+
+        assert second._opening_cache is first._opening_cache
+
+    def test_cache_is_the_public_mapping(self):
+        """The repository uses the mapping opening_fen_to_id() returns."""
+        OpeningFactory()
+
+        assert GameRepository()._opening_cache is opening_fen_to_id()
+
+    def test_cache_invalidated_on_opening_save(self):
+        """Saving an Opening makes new repositories see it."""
+        GameRepository()
+        opening = OpeningFactory()
+
+        repo = GameRepository()
+
+        assert repo._opening_cache[opening.fen] == opening.id
+
+    def test_cache_reloaded_after_bulk_create(self):
+        """bulk_create sends no signals but still refreshes the cache."""
+        GameRepository()
+        opening = OpeningFactory.build()
+        Opening.objects.bulk_create([opening])
+
+        repo = GameRepository()
+
+        assert opening.fen in repo._opening_cache
+
+
 @pytest.mark.django_db
 class TestGameRepositorySave:
     """Tests for GameRepository.save method."""
@@ -118,10 +161,11 @@ class TestGameRepositorySave:
     def test_save_with_opening_detected(self):
         """save() detects opening from moves and sets opening_id."""
         opening = OpeningFactory()
-        with patch("chess_core.repositories.OpeningDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_opening.return_value = OpeningMatch(
-                fen=opening.fen, ply=6
-            )
+        match = OpeningMatch(fen=opening.fen, ply=6)
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=match, endgame=None),
+        ):
             repo = GameRepository()
             game_data = make_game_data(source_id="opening-game")
 
@@ -131,10 +175,11 @@ class TestGameRepositorySave:
 
     def test_save_with_opening_unknown_fen(self):
         """save() sets opening to None when detected FEN not in cache."""
-        with patch("chess_core.repositories.OpeningDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_opening.return_value = OpeningMatch(
-                fen="unknown-fen", ply=6
-            )
+        match = OpeningMatch(fen="unknown-fen", ply=6)
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=match, endgame=None),
+        ):
             repo = GameRepository()
             game_data = make_game_data(source_id="unknown-opening-game")
 
@@ -144,8 +189,10 @@ class TestGameRepositorySave:
 
     def test_save_with_no_opening_match(self):
         """save() sets opening to None when no opening detected."""
-        with patch("chess_core.repositories.OpeningDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_opening.return_value = None
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=None, endgame=None),
+        ):
             repo = GameRepository()
             game_data = make_game_data(source_id="no-opening-game")
 
@@ -272,6 +319,51 @@ class TestGameRepositorySaveBatch:
         assert count == 2  # Both processed
         assert Game.objects.count() == 2  # But only 2 in DB (one existing + one new)
 
+    def test_save_batch_skips_detection_for_existing(self):
+        """save_batch() does not run opening detection for stored games."""
+        GameFactory(source_id="existing", white_player="Original")
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=None, endgame=None),
+        ) as mock_analyze:
+            repo = GameRepository()
+            games = [
+                make_game_data(source_id="existing"),
+                make_game_data(source_id="new-game"),
+            ]
+
+            repo.save_batch(games)
+
+        mock_analyze.assert_called_once()
+        assert Game.objects.get(source_id="existing").white_player == "Original"
+
+    def test_save_batch_update_existing_overwrites(self):
+        """save_batch(update_existing=True) upserts stored games."""
+        GameFactory(source_id="existing", white_player="Original")
+        repo = GameRepository()
+        games = [
+            make_game_data(source_id="existing", white_player="Updated"),
+            make_game_data(source_id="new-game"),
+        ]
+
+        count = repo.save_batch(games, update_existing=True)
+
+        assert count == 2
+        assert Game.objects.count() == 2
+        assert Game.objects.get(source_id="existing").white_player == "Updated"
+
+    def test_save_batch_update_existing_repeated_in_batch(self):
+        """Repeated source_ids in one upsert batch keep the last occurrence."""
+        repo = GameRepository()
+        games = [
+            make_game_data(source_id="dup", white_player="First"),
+            make_game_data(source_id="dup", white_player="Second"),
+        ]
+
+        repo.save_batch(games, update_existing=True)
+
+        assert Game.objects.get(source_id="dup").white_player == "Second"
+
     def test_save_batch_with_generator(self):
         """save_batch() works with generator."""
         repo = GameRepository()
@@ -285,13 +377,31 @@ class TestGameRepositorySaveBatch:
         assert count == 3
         assert Game.objects.count() == 3
 
+    def test_save_batch_clears_debug_query_log(self):
+        """save_batch() clears the query log only when DEBUG is on."""
+        repo = GameRepository()
+        games = [make_game_data(source_id=f"debug-{i}") for i in range(4)]
+
+        with override_settings(DEBUG=True):
+            repo.save_batch(games, batch_size=2)
+            assert len(connection.queries) == 0
+
+        # With DEBUG off, query capturing still sees the batch queries.
+        games = [make_game_data(source_id=f"capture-{i}") for i in range(4)]
+        with CaptureQueriesContext(connection) as captured:
+            repo.save_batch(games, batch_size=2)
+
+        assert len(captured.captured_queries) > 0
+        assert Game.objects.count() == 8
+
     def test_save_batch_with_openings(self):
         """save_batch() detects opening from moves for all games."""
         opening = OpeningFactory()
-        with patch("chess_core.repositories.OpeningDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_opening.return_value = OpeningMatch(
-                fen=opening.fen, ply=6
-            )
+        match = OpeningMatch(fen=opening.fen, ply=6)
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=match, endgame=None),
+        ):
             repo = GameRepository()
             games = [
                 make_game_data(source_id="game-1"),
@@ -304,6 +414,176 @@ class TestGameRepositorySaveBatch:
         assert all(g.opening_id == opening.id for g in saved_games)
 
 
+@pytest.mark.django_db(transaction=True)
+class TestGameRepositorySaveStream:
+    """Tests for GameRepository.save_stream method."""
+
+    def test_save_stream_saves_all_batches(self):
+        """save_stream() writes every batch and returns the count."""
+        repo = GameRepository()
+        games = (make_game_data(source_id=f"stream-{i}") for i in range(5))
+
+        count = repo.save_stream(games, batch_size=2, workers=1)
+
+        assert count == 5
+        assert Game.objects.count() == 5
+
+    def test_save_stream_skips_existing(self):
+        """save_stream() skips games already in the database."""
+        GameFactory(source_id="stream-1", white_player="Original")
+        repo = GameRepository()
+
+        repo.save_stream([make_game_data(source_id="stream-1", white_player="New")])
+
+        assert Game.objects.get(source_id="stream-1").white_player == "Original"
+
+    def test_save_stream_reraises_flush_error(self):
+        """Errors raised on a database thread surface in the caller."""
+        repo = GameRepository()
+        with (
+            patch.object(repo, "_flush_batch", side_effect=RuntimeError("boom")),
+            pytest.raises(RuntimeError, match="boom"),
+        ):
+            repo.save_stream([make_game_data()], batch_size=1)
+
+    def test_save_stream_stops_reading_after_flush_error(self):
+        """A failed batch stops the input from being read to the end."""
+        repo = GameRepository()
+        failed = threading.Event()
+        consumed = []
+
+        def fail(*args):
+            failed.set()
+            raise RuntimeError("boom")
+
+        def games():
+            for i in range(1000):
+                if i == 1:
+                    failed.wait(timeout=5)
+                consumed.append(i)
+                yield make_game_data(source_id=f"stream-{i}")
+
+        with (
+            patch.object(repo, "_flush_batch", side_effect=fail),
+            pytest.raises(RuntimeError, match="boom"),
+        ):
+            repo.save_stream(games(), batch_size=1)
+
+        assert len(consumed) < 100
+
+
+@pytest.mark.django_db
+class TestGameRepositorySaveBulkCopy:
+    """Tests for GameRepository.save_bulk_copy method."""
+
+    def test_save_bulk_copy_saves_games(self):
+        """save_bulk_copy() saves every game and returns the count."""
+        repo = GameRepository()
+        games = [make_game_data(source_id=f"copy-{i}") for i in range(3)]
+
+        count = repo.save_bulk_copy(games)
+
+        assert count == 3
+        assert Game.objects.count() == 3
+
+    def test_save_bulk_copy_updates_existing(self):
+        """save_bulk_copy() overwrites games whose source_id exists."""
+        GameFactory(source_id="copy-1", white_player="Original")
+        repo = GameRepository()
+
+        repo.save_bulk_copy(
+            [make_game_data(source_id="copy-1", white_player="New")],
+            update_existing=True,
+        )
+
+        assert Game.objects.count() == 1
+        assert Game.objects.get(source_id="copy-1").white_player == "New"
+
+    def test_save_bulk_copy_skips_existing_by_default(self):
+        """save_bulk_copy() leaves existing games alone, like save_batch()."""
+        GameFactory(source_id="copy-1", white_player="Original")
+        repo = GameRepository()
+
+        repo.save_bulk_copy([make_game_data(source_id="copy-1", white_player="New")])
+
+        assert Game.objects.get(source_id="copy-1").white_player == "Original"
+
+    @pytest.mark.postgresql
+    def test_copy_merges_batches_through_staging_table(self):
+        """COPY batches insert new games, link openings and skip existing ones."""
+        opening = OpeningFactory(fen=FEN_AFTER_E4_E5)
+        GameFactory(source_id="copy-1", white_player="Original")
+        repo = GameRepository()
+        games = [
+            make_game_data(source_id="copy-1", white_player="New"),
+            make_game_data(source_id="copy-2", white_player="First"),
+            make_game_data(source_id="copy-2", white_player="Last"),
+            make_game_data(source_id="copy-3"),
+        ]
+
+        # batch_size=2 stages three times in one session, so each batch
+        # must drop its staging table.
+        with CaptureQueriesContext(connection) as queries:
+            count = repo.save_bulk_copy(games, batch_size=2)
+
+        assert count == 4
+        assert sum("FROM game_staging" in q["sql"] for q in queries) == 2
+        saved = {g.source_id: g for g in Game.objects.all()}
+        assert saved["copy-1"].white_player == "Original"
+        assert saved["copy-2"].white_player == "First"
+        assert saved["copy-3"].opening_id == opening.id
+        assert saved["copy-3"].move_count_ply == 2
+
+    @pytest.mark.postgresql
+    def test_copy_updates_existing_keeping_last_duplicate(self):
+        """With update_existing, the last copy of a source_id in a batch wins."""
+        GameFactory(source_id="copy-1", white_player="Original")
+        repo = GameRepository()
+
+        repo.save_bulk_copy(
+            [
+                make_game_data(source_id="copy-1", white_player="First"),
+                make_game_data(source_id="copy-1", white_player="Last"),
+            ],
+            update_existing=True,
+        )
+
+        assert Game.objects.get(source_id="copy-1").white_player == "Last"
+
+
+@pytest.mark.django_db
+class TestGameRepositoryUpdateField:
+    """Tests for GameRepository.update_field method."""
+
+    def test_update_field_sets_values_by_id(self):
+        """update_field() writes each game's own value and returns the count."""
+        first = GameFactory(move_count_ply=None)
+        second = GameFactory(move_count_ply=None)
+        untouched = GameFactory(move_count_ply=7)
+        repo = GameRepository()
+
+        updated = repo.update_field({first.id: 10, second.id: 20}, "move_count_ply")
+
+        assert updated == 2
+        assert Game.objects.get(id=first.id).move_count_ply == 10
+        assert Game.objects.get(id=second.id).move_count_ply == 20
+        assert Game.objects.get(id=untouched.id).move_count_ply == 7
+
+    def test_update_field_foreign_key(self):
+        """update_field() accepts a foreign key field name with id values."""
+        opening = OpeningFactory()
+        game = GameFactory(opening=None)
+        repo = GameRepository()
+
+        repo.update_field({game.id: opening.id}, "opening")
+
+        assert Game.objects.get(id=game.id).opening_id == opening.id
+
+    def test_update_field_empty(self):
+        """update_field() with no values does nothing."""
+        assert GameRepository().update_field({}, "move_count_ply") == 0
+
+
 @pytest.mark.django_db
 class TestGameRepositoryExists:
     """Tests for GameRepository.exists method."""
@@ -357,10 +637,11 @@ class TestGameRepositoryOpeningCache:
 
     def test_cache_miss_returns_none(self):
         """Detected FEN not in cache yields None opening_id."""
-        with patch("chess_core.repositories.OpeningDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_opening.return_value = OpeningMatch(
-                fen="unknown-fen", ply=6
-            )
+        match = OpeningMatch(fen="unknown-fen", ply=6)
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=match, endgame=None),
+        ):
             repo = GameRepository()
             game_data = make_game_data()
 
@@ -371,10 +652,11 @@ class TestGameRepositoryOpeningCache:
     def test_cache_hit_returns_id(self):
         """Detected FEN in cache yields correct opening_id."""
         opening = OpeningFactory()
-        with patch("chess_core.repositories.OpeningDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_opening.return_value = OpeningMatch(
-                fen=opening.fen, ply=6
-            )
+        match = OpeningMatch(fen=opening.fen, ply=6)
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=match, endgame=None),
+        ):
             repo = GameRepository()
             game_data = make_game_data()
 
@@ -390,10 +672,11 @@ class TestGameRepositoryFieldMapping:
     def test_all_fields_mapped(self):
         """All GameData fields are mapped correctly."""
         opening = OpeningFactory()
-        with patch("chess_core.repositories.OpeningDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_opening.return_value = OpeningMatch(
-                fen=opening.fen, ply=6
-            )
+        match = OpeningMatch(fen=opening.fen, ply=6)
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=match, endgame=None),
+        ):
             repo = GameRepository()
             game_data = make_game_data(
                 event="Test Event",
@@ -464,8 +747,10 @@ class TestGameRepositoryEndgameFields:
             fen="4k3/8/8/8/8/8/8/4K3 w - - 0 1",
             ply=42,
         )
-        with patch("chess_core.repositories.EndgameDetector") as mock_detector_cls:
-            mock_detector_cls.return_value.detect_endgame.return_value = entry
+        with patch(
+            "chess_core.repositories.analyze_game",
+            return_value=GameAnalysis(opening=None, endgame=entry),
+        ):
             repo = GameRepository()
             game_data = make_game_data(
                 source_id="endgame-game",
@@ -1,12 +1,24 @@
-"""Tests for OpeningDetector and EndgameDetector services."""
+"""Tests for OpeningDetector, EndgameDetector and analyze_game services."""
 
 from unittest.mock import patch
 
+import chess
 import pytest
 
+from chess_core.services.analysis import analyze_game
 from chess_core.services.endgame import EndgameDetector, EndgameEntry
 from chess_core.services.move_parsing import parse_san_moves
-from chess_core.services.openings import OpeningDetector, OpeningMatch
+from chess_core.services.openings import (
+    OpeningDetector,
+    OpeningMatch,
+    _position_key,
+)
+from chess_core.tests.constants import FEN_AFTER_E4, FEN_AFTER_E4_E5, FEN_RUY_LOPEZ
+
+# Opening FEN sets shared by the tests that build a detector without the database.
+E4_FENS = frozenset({FEN_AFTER_E4})
+OPEN_GAME_FENS = frozenset({FEN_AFTER_E4, FEN_AFTER_E4_E5})
+RUY_LOPEZ_FENS = frozenset({FEN_AFTER_E4, FEN_RUY_LOPEZ})
 
 
 class TestOpeningMatch:
@@ -20,9 +32,7 @@ class TestOpeningMatch:
 
     def test_opening_match_attributes(self):
         """OpeningMatch has correct attributes."""
-        match = OpeningMatch(
-            fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1", ply=1
-        )
+        match = OpeningMatch(fen=FEN_AFTER_E4, ply=1)
         assert hasattr(match, "fen")
         assert hasattr(match, "ply")
 
@@ -39,7 +49,8 @@ class TestOpeningDetectorInit:
     def test_init_empty_database(self):
         """Detector handles empty database."""
         detector = OpeningDetector()
-        assert isinstance(detector._fen_set, set)
+        assert isinstance(detector._fen_set, frozenset)
+        assert not detector._fen_set
 
     def test_init_with_fen_set_skips_db(self):
         """When fen_set is provided, no database query is performed."""
@@ -50,6 +61,29 @@ class TestOpeningDetectorInit:
             assert detector._fen_set == fen_set
             mock_opening.objects.values_list.assert_not_called()
 
+    def test_init_keeps_given_frozenset(self):
+        """A frozenset of FENs is used as is, without copying."""
+        detector = OpeningDetector(fen_set=E4_FENS)
+        assert detector._fen_set is E4_FENS
+
+    def test_detectors_share_loaded_fens(self, opening_set, django_assert_num_queries):
+        """A second detector only checks the table stamp."""
+        first = OpeningDetector()
+        with django_assert_num_queries(1):
+            second = OpeningDetector()
+
+        assert second._fen_set == first._fen_set
+        assert second._fen_by_key is first._fen_by_key
+
+    def test_saved_opening_reloads_fens(self, opening_set):
+        """Saving an opening makes the next detector see its new FEN."""
+        OpeningDetector()
+        opening = opening_set[0]
+        opening.fen = "8/8/8/8/8/8/8/K6k w - - 0 1"
+        opening.save()
+
+        assert opening.fen in OpeningDetector()._fen_set
+
 
 @pytest.mark.django_db
 class TestOpeningDetectorDetect:
@@ -172,51 +206,176 @@ class TestParseSanMoves:
         """Parse moves with ellipsis notation (continuation)."""
         assert parse_san_moves("1... e5 2. Nf3") == ["e5", "Nf3"]
 
+    def test_parse_moves_keeps_tokens_containing_markers(self) -> None:
+        """Only whole tokens are dropped, not markers inside a move."""
+        assert parse_san_moves("1. e4\n*x 1-0x 12 1.2") == ["e4", "*x", "1-0x"]
+
 
 class TestOpeningDetectorMocked:
-    """Tests for OpeningDetector with mocked database."""
+    """Tests for OpeningDetector with an in-memory FEN set."""
 
     def test_detect_fen_matching(self):
-        """Test FEN matching logic with mock."""
-        with patch.object(OpeningDetector, "__init__", lambda self: None):
-            detector = OpeningDetector()
-            detector._fen_set = {
-                "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",  # After 1. e4
-            }
+        """Test FEN matching logic without the database."""
+        detector = OpeningDetector(fen_set=E4_FENS)
 
-            result = detector.detect_opening("1. e4")
+        result = detector.detect_opening("1. e4")
 
-            assert result is not None
-            assert result.ply == 1
+        assert result is not None
+        assert result.ply == 1
 
     def test_detect_multiple_positions_in_set(self):
         """Test detection with multiple positions in set."""
-        with patch.object(OpeningDetector, "__init__", lambda self: None):
-            detector = OpeningDetector()
-            detector._fen_set = {
-                "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",  # After 1. e4
-                "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",  # After 1... e5
-            }
+        detector = OpeningDetector(fen_set=OPEN_GAME_FENS)
 
-            result = detector.detect_opening("1. e4 e5")
+        result = detector.detect_opening("1. e4 e5")
 
-            # Should return the deepest match (ply 2)
-            assert result is not None
-            assert result.ply == 2
+        # Should return the deepest match (ply 2)
+        assert result is not None
+        assert result.ply == 2
 
     def test_detect_ambiguous_move(self):
         """Test that ambiguous moves stop parsing."""
-        with patch.object(OpeningDetector, "__init__", lambda self: None):
-            detector = OpeningDetector()
-            detector._fen_set = {
-                "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
-            }
+        detector = OpeningDetector(fen_set=E4_FENS)
+
+        # This move sequence leads to ambiguous knight move if not handled
+        result = detector.detect_opening("1. e4")
+
+        assert result is not None
+        assert result.ply == 1
+
+    def test_match_position(self):
+        """match_position returns the stored FEN for a known position."""
+        detector = OpeningDetector(fen_set={FEN_AFTER_E4, "not a fen"})
+        board = chess.Board()
+
+        assert detector.match_position(board) is None
+        board.push_san("e4")
+        assert detector.match_position(board) == FEN_AFTER_E4
+
+    def test_match_position_ignores_move_counters(self):
+        """Positions differing only in move counters still match."""
+        detector = OpeningDetector(fen_set=E4_FENS)
+        board = chess.Board(FEN_AFTER_E4)
+        board.halfmove_clock = 2
+        board.fullmove_number = 3
+
+        assert detector.match_position(board) == FEN_AFTER_E4
+
+    def test_match_position_prefers_same_move_counters(self):
+        """Among FENs sharing a position, the one with equal counters wins."""
+        transposed = FEN_AFTER_E4.replace(" 0 1", " 2 3")
+        detector = OpeningDetector(fen_set={FEN_AFTER_E4, transposed})
+        board = chess.Board(transposed)
+
+        assert detector.match_position(board) == transposed
+        board.fullmove_number = 5
+        assert detector.match_position(board) == FEN_AFTER_E4
+
+    def test_shared_prefix_replayed_once(self):
+        """Moves already seen in an earlier game are not parsed again."""
+        detector = OpeningDetector(fen_set={FEN_AFTER_E4_E5})
+        detector.detect_opening("1. e4 e5 2. Nf3")
+
+        with patch.object(
+            chess.Board, "parse_san", autospec=True, side_effect=chess.Board.parse_san
+        ) as mock_parse_san:
+            result = detector.detect_opening("1. e4 e5 2. Nf3 Nc6")
+
+        assert result == OpeningMatch(fen=FEN_AFTER_E4_E5, ply=2)
+        assert mock_parse_san.call_count == 1
+
+    @pytest.mark.parametrize("max_nodes", [0, 50_000])
+    def test_detection_stops_below_opening_piece_count(self, max_nodes):
+        """Moves after a capture below every opening's piece count are skipped."""
+        detector = OpeningDetector(fen_set=E4_FENS)
+
+        with (
+            patch("chess_core.services.openings._TRIE_MAX_NODES", max_nodes),
+            patch.object(
+                chess.Board,
+                "parse_san",
+                autospec=True,
+                side_effect=chess.Board.parse_san,
+            ) as mock_parse_san,
+        ):
+            result = detector.detect_opening("1. e4 d5 2. exd5 Qxd5 3. Nc3 Qa5")
+
+        assert result == OpeningMatch(fen=FEN_AFTER_E4, ply=1)
+        assert mock_parse_san.call_count == 3
+
+    def test_detect_opening_uci(self):
+        """UCI moves give the same match as the SAN entry point."""
+        detector = OpeningDetector(fen_set=RUY_LOPEZ_FENS)
+        result = detector.detect_opening_uci(
+            ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5", "a7a6"]
+        )
+
+        assert result == OpeningMatch(fen=FEN_RUY_LOPEZ, ply=5)
+
+    def test_detect_opening_uci_invalid_move_stops(self):
+        """A malformed UCI move stops detection, keeping earlier matches."""
+        detector = OpeningDetector(fen_set=OPEN_GAME_FENS)
+        result = detector.detect_opening_uci(["e2e4", "e7", "e7e5"])
+
+        assert result == OpeningMatch(fen=FEN_AFTER_E4, ply=1)
+
+    def test_detect_opening_uci_illegal_move_stops(self):
+        """A well-formed but illegal UCI move stops detection."""
+        detector = OpeningDetector(fen_set=OPEN_GAME_FENS)
+        result = detector.detect_opening_uci(["e2e4", "e2e4", "e7e5"])
+
+        assert result == OpeningMatch(fen=FEN_AFTER_E4, ply=1)
+
+    def test_detect_opening_illegal_move_matches_uci(self):
+        """An illegal SAN move stops replay where the UCI path stops."""
+        detector = OpeningDetector(fen_set=OPEN_GAME_FENS)
+
+        with patch("chess_core.services.openings._TRIE_MAX_NODES", 0):
+            result = detector.detect_opening("1. e4 Ke7 2. Nf3")
+
+        assert result == detector.detect_opening_uci(["e2e4", "e8e7", "g1f3"])
+        assert result == OpeningMatch(fen=FEN_AFTER_E4, ply=1)
+
+    def test_illegal_early_move_stops_in_trie(self):
+        """An illegal move within the trie depth ends detection cleanly."""
+        detector = OpeningDetector(fen_set=OPEN_GAME_FENS)
 
-            # This move sequence leads to ambiguous knight move if not handled
-            result = detector.detect_opening("1. e4")
+        result = detector.detect_opening("1. e4 Ke7 2. Nf3")
 
-            assert result is not None
-            assert result.ply == 1
+        assert result == OpeningMatch(fen=FEN_AFTER_E4, ply=1)
+        assert "Ke7" not in detector._root.children["e4"].children
+
+    @pytest.mark.parametrize(
+        ("fen_a", "fen_b", "same"),
+        [
+            # Move counters are not part of the position.
+            (FEN_AFTER_E4, FEN_AFTER_E4.replace("0 1", "3 9"), True),
+            # An en passant square no pawn can capture on is not either.
+            (FEN_AFTER_E4, FEN_AFTER_E4.replace(" - ", " e3 "), True),
+            (
+                "rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPP2PPP/RNBQKBNR b KQkq e3 0 3",
+                "rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 3",
+                False,
+            ),
+            (FEN_AFTER_E4, FEN_AFTER_E4.replace("KQkq", "Kkq"), False),
+        ],
+    )
+    def test_position_key_matches_fen_prefix(self, fen_a, fen_b, same):
+        """Boards share a key exactly when their FENs share the position."""
+        key_a = _position_key(chess.Board(fen_a))
+        key_b = _position_key(chess.Board(fen_b))
+
+        assert (key_a == key_b) is same
+
+    def test_full_trie_falls_back_to_replay(self):
+        """Detection gives the same result once the trie cannot grow."""
+        detector = OpeningDetector(fen_set=RUY_LOPEZ_FENS)
+        detector.detect_opening("1. e4 c5")
+
+        with patch("chess_core.services.openings._TRIE_MAX_NODES", 0):
+            result = detector.detect_opening("1. e4 e5 2. Nf3 Nc6 3. Bb5 a6")
+
+        assert result == OpeningMatch(fen=FEN_RUY_LOPEZ, ply=5)
 
 
 @pytest.mark.django_db
@@ -286,7 +445,7 @@ class TestEndgameDetector:
     def test_detect_endgame_returns_first_ply_and_fen(self) -> None:
         """When endgame is reached, returns first ply and FEN."""
         detector = EndgameDetector()
-        with patch("chess_core.services.endgame.is_endgame") as mock_is_endgame:
+        with patch("chess_core.services.endgame.is_endgame_board") as mock_is_endgame:
             # Return True on second call (after 1. e4 e5, ply 2)
             mock_is_endgame.side_effect = [False, True]
             result = detector.detect_endgame("1. e4 e5 2. Nf3")
@@ -299,3 +458,47 @@ class TestEndgameDetector:
         detector = EndgameDetector()
         result = detector.detect_endgame("1. e4 e5 2. Nf3 Nc6 3. Ke2")
         assert result is None
+
+    def test_detect_endgame_illegal_move_stops_parsing(self) -> None:
+        """Illegal move stops parsing instead of raising."""
+        detector = EndgameDetector()
+        result = detector.detect_endgame("1. e4 Ke7 2. Nf3")
+        assert result is None
+
+
+class TestAnalyzeGame:
+    """Tests for analyze_game."""
+
+    def test_empty_moves_finds_nothing(self) -> None:
+        """Empty move string yields neither opening nor endgame."""
+        analysis = analyze_game("", OpeningDetector(fen_set=E4_FENS))
+        assert analysis.opening is None
+        assert analysis.endgame is None
+
+    def test_matches_both_detectors(self) -> None:
+        """Opening and endgame agree with the standalone detectors."""
+        moves = "1. e4 e5 2. Nf3 Nc6 3. Bb5"
+        detector = OpeningDetector(fen_set=OPEN_GAME_FENS)
+        with patch("chess_core.services.analysis.is_endgame_board") as mock_is_endgame:
+            mock_is_endgame.side_effect = [False, False, True]
+            analysis = analyze_game(moves, detector)
+
+        assert analysis.opening == detector.detect_opening(moves)
+        assert analysis.endgame is not None
+        assert analysis.endgame.ply == 3
+        # The endgame check stops once the first endgame position is found.
+        assert mock_is_endgame.call_count == 3
+
+    def test_invalid_move_stops_replay(self) -> None:
+        """Replay stops at an invalid move, keeping earlier matches."""
+        detector = OpeningDetector(fen_set={FEN_AFTER_E4_E5})
+        analysis = analyze_game("1. e4 e5 2. invalid Nc6", detector)
+        assert analysis.opening == OpeningMatch(fen=FEN_AFTER_E4_E5, ply=2)
+        assert analysis.endgame is None
+
+    def test_illegal_move_stops_replay(self) -> None:
+        """Replay stops at an illegal move, keeping earlier matches."""
+        detector = OpeningDetector(fen_set={FEN_AFTER_E4_E5})
+        analysis = analyze_game("1. e4 e5 2. Ke3 Nc6", detector)
+        assert analysis.opening == OpeningMatch(fen=FEN_AFTER_E4_E5, ply=2)
+        assert analysis.endgame is None
@@ -26,56 +26,26 @@ def opening(db) -> Opening:
 @pytest.fixture
 def games_jan_feb(db, opening: Opening) -> list[Game]:
     """Games in Jan and Feb 2024 with known results."""
-    created = []
-    # Jan 2024: 2 white wins, 1 draw, 1 black win
-    for _ in range(2):
-        created.append(
-            GameFactory(
-                opening=opening,
-                date=date(2024, 1, 15),
-                result="1-0",
-                white_player="A",
-                black_player="B",
-            )
-        )
-    created.append(
-        GameFactory(
-            opening=opening,
-            date=date(2024, 1, 16),
-            result="1/2-1/2",
-            white_player="A",
-            black_player="B",
-        )
-    )
-    created.append(
-        GameFactory(
-            opening=opening,
-            date=date(2024, 1, 17),
-            result="0-1",
-            white_player="A",
-            black_player="B",
-        )
-    )
-    # Feb 2024: 1 white win, 1 black win
-    created.append(
-        GameFactory(
+    dated_results = [
+        # Jan 2024: 2 white wins, 1 draw, 1 black win
+        (date(2024, 1, 15), "1-0"),
+        (date(2024, 1, 15), "1-0"),
+        (date(2024, 1, 16), "1/2-1/2"),
+        (date(2024, 1, 17), "0-1"),
+        # Feb 2024: 1 white win, 1 black win
+        (date(2024, 2, 10), "1-0"),
+        (date(2024, 2, 11), "0-1"),
+    ]
+    return Game.objects.bulk_create(
+        GameFactory.build(
             opening=opening,
-            date=date(2024, 2, 10),
-            result="1-0",
+            date=game_date,
+            result=result,
             white_player="A",
             black_player="B",
         )
+        for game_date, result in dated_results
     )
-    created.append(
-        GameFactory(
-            opening=opening,
-            date=date(2024, 2, 11),
-            result="0-1",
-            white_player="A",
-            black_player="B",
-        )
-    )
-    return created
 
 
 @pytest.mark.django_db
@@ -125,6 +95,22 @@ class TestGetWinRateOverTime:
         assert jan["draw_pct"] == 25.0
         assert jan["black_pct"] == 25.0
 
+    def test_aggregates_in_single_query(
+        self, games_jan_feb: list, django_assert_num_queries
+    ) -> None:
+        """Buckets and result counts come back from one GROUP BY query."""
+        with django_assert_num_queries(1):
+            items = get_win_rate_over_time(WinRateOverTimeFilterParams(period="month"))
+        assert sum(item["game_count"] for item in items) == len(games_jan_feb)
+
+    def test_period_buckets_stored_on_game(self, db: None) -> None:
+        """Generated date_week/month/year columns hold each period's first day."""
+        game = GameFactory(date=date(2024, 1, 14))
+        game.refresh_from_db()
+        assert game.date_week == date(2024, 1, 8)
+        assert game.date_month == date(2024, 1, 1)
+        assert game.date_year == date(2024, 1, 1)
+
     def test_min_games_filters_sparse_periods(self, games_jan_feb: list) -> None:
         """Periods with fewer than min_games are excluded."""
         params = WinRateOverTimeFilterParams(
@@ -171,6 +157,17 @@ class TestGetWinRateOverTime:
         assert "2024-01" not in periods
         assert "2024-02" in periods
 
+    def test_max_date_to(self, games_jan_feb: list) -> None:
+        """date_to on the last representable day keeps every game."""
+        params = WinRateOverTimeFilterParams(
+            period="month",
+            date_from=date(2024, 1, 1),
+            date_to=date.max,
+            min_games=1,
+        )
+        periods = [i["period"] for i in get_win_rate_over_time(params)]
+        assert periods == ["2024-01", "2024-02"]
+
     def test_opening_threshold_filters_by_ply_count(self, db: None) -> None:
         """Only games whose opening has ply_count >= opening_threshold are included."""
         opening_short = OpeningFactory(eco_code="A00", name="Short", ply_count=1)
@@ -1,21 +1,24 @@
 """Views for the HTMX explorer UI."""
 
-import re
+import dataclasses
+import hashlib
 from datetime import date
 from urllib.parse import urlencode
 
+from django.core.cache import cache
 from django.http import Http404
 from django.shortcuts import get_object_or_404, render
 from pydantic import ValidationError
 
-from chess_core.api.schemas import OpeningStatsFilterSchema
+from chess_core.api.schemas import ExploreChartFilterSchema, OpeningStatsFilterSchema
 from chess_core.models import Opening
 from chess_core.services.latest_game import get_latest_game_for_opening
 from chess_core.services.opening_game_details import get_opening_game_details
 from chess_core.services.opening_stats import (
     ALLOWED_SORT_FIELDS,
+    OPENING_STATS_SERVICE,
+    PAGE_SIZE_MAX,
     OpeningStatsFilterParams,
-    OpeningStatsService,
 )
 from chess_core.services.win_rate_over_time import (
     WinRateOverTimeFilterParams,
@@ -24,117 +27,140 @@ from chess_core.services.win_rate_over_time import (
 
 RESULT_TOKENS = frozenset({"1-0", "0-1", "1/2-1/2", "*"})
 
+# HTMX target of sort and pagination links; requests aimed at it re-render
+# only the stats table and skip the chart.
+STATS_TABLE_TARGET = "opening-stats-results"
+
+# Game fields the latest-game templates render.
+LATEST_GAME_FIELDS = (
+    "date",
+    "white_player",
+    "black_player",
+    "white_elo",
+    "black_elo",
+    "result",
+    "moves",
+)
+
+# Seconds a win-rate chart stays cached; sort and page clicks reuse it.
+CHART_CACHE_TIMEOUT = 300
+
+# Filters used when the query string fails validation; never mutated.
+_DEFAULT_PARAMS = OpeningStatsFilterParams()
+
+
+def _move_row(num: int, tokens: list[str]) -> dict[str, str | int]:
+    """Build one (number, white, black) table row from a move's SAN tokens."""
+    black = tokens[1] if len(tokens) > 1 else ""
+    return {"num": num, "white": tokens[0], "black": black}
+
 
 def _parse_moves_to_table(moves_str: str) -> list[dict[str, str | int]]:
     """Parse PGN move text into rows for a (number, white, black) table.
 
     Drops result tokens (1-0, 0-1, 1/2-1/2, *) and supports standard
-    "1. e4 e5 2. Nf3 Nc6" style notation.
+    "1. e4 e5 2. Nf3 Nc6" style notation. A move number followed by
+    "..." (black to move) leaves "..." in the white column.
+
+    The text is scanned once: each move number closes the previous row and
+    the next two SAN tokens fill the new one.
     """
-    if not moves_str or not moves_str.strip():
-        return []
-    text = moves_str.strip()
-    for res in RESULT_TOKENS:
-        if text.endswith(res):
-            text = text[: -len(res)].strip()
-            break
-    segments = re.split(r"\s*\d+\.\s*", text)
     rows: list[dict[str, str | int]] = []
-    for seg in segments:
-        seg = seg.strip()
-        if not seg:
-            continue
-        tokens = [t for t in seg.split() if t not in RESULT_TOKENS]
-        if not tokens:
-            continue
-        move_num = len(rows) + 1
-        white = tokens[0]
-        black = tokens[1] if len(tokens) > 1 else ""
-        rows.append({"num": move_num, "white": white, "black": black})
+    pending: list[str] = []
+    for token in moves_str.split():
+        if token[0].isdigit():
+            number, dot, rest = token.partition(".")
+            if dot and number.isdigit():
+                if pending:
+                    rows.append(_move_row(len(rows) + 1, pending))
+                pending = ["..."] if rest.startswith("..") else []
+                token = rest.lstrip(".")
+                if not token:
+                    continue
+        if len(pending) < 2 and token not in RESULT_TOKENS:
+            pending.append(token)
+    if pending:
+        rows.append(_move_row(len(rows) + 1, pending))
     return rows
 
 
-def _get_params_from_request(request):
-    """Build filter params and form data from request.GET.
+def _get_params_from_request(get_dict: dict):
+    """Build filter params and form data from the request's GET dict.
 
     Returns:
         Tuple of (filter_params, form_data, validation_error).
-        On success: (OpeningStatsFilterParams, request.GET.dict(), None).
-        On ValidationError: (default params, raw GET dict, ValidationError).
+        On success: (OpeningStatsFilterParams, get_dict, None).
+        On ValidationError: (default params, get_dict, ValidationError).
     """
-    raw = request.GET.dict()
-    data = {k: v for k, v in raw.items() if v != ""}
+    data = {k: v for k, v in get_dict.items() if v != ""}
     if "threshold" not in data:
         data["threshold"] = 10
     if "opening_threshold" not in data:
         data["opening_threshold"] = 3
     try:
-        schema = OpeningStatsFilterSchema(**data)
-        params = OpeningStatsFilterParams(**schema.model_dump())
-        return params, raw, None
+        schema = OpeningStatsFilterSchema.model_validate(data)
+        # Fields are flat, so iterating the model skips model_dump's
+        # serializer pass and dict copy.
+        params = OpeningStatsFilterParams(**dict(schema))
+        return params, get_dict, None
     except ValidationError as e:
-        return OpeningStatsFilterParams(), raw, e
+        return _DEFAULT_PARAMS, get_dict, e
 
 
-def _get_chart_params_from_request(request) -> WinRateOverTimeFilterParams:
-    """Build win-rate-over-time filter params from request.GET."""
-    get_dict = request.GET.dict()
-    period = get_dict.get("chart_period") or "week"
-    if period not in ("week", "month", "year"):
-        period = "week"
-    date_from = None
-    if get_dict.get("date_from"):
-        try:
-            date_from = date.fromisoformat(get_dict["date_from"])
-        except (ValueError, TypeError):
-            pass
-    date_to = None
-    if get_dict.get("date_to"):
-        try:
-            date_to = date.fromisoformat(get_dict["date_to"])
-        except (ValueError, TypeError):
-            pass
-    threshold_val = get_dict.get("threshold")
-    min_games = 1
-    if threshold_val is not None:
-        try:
-            min_games = max(1, int(threshold_val))
-        except (ValueError, TypeError):
-            pass
-    opening_threshold = None
-    if get_dict.get("opening_threshold") is not None:
-        try:
-            opening_threshold = max(1, int(get_dict["opening_threshold"]))
-        except (ValueError, TypeError):
-            pass
-    return WinRateOverTimeFilterParams(
-        period=period,
-        date_from=date_from,
-        date_to=date_to,
-        eco_code=get_dict.get("eco_code") or None,
-        opening_name=get_dict.get("opening_name") or None,
-        min_games=min_games,
-        opening_threshold=opening_threshold,
+def _get_chart_params_from_request(get_dict: dict) -> WinRateOverTimeFilterParams:
+    """Build win-rate-over-time filter params from the request's GET dict."""
+    schema = ExploreChartFilterSchema.model_validate(get_dict)
+    return WinRateOverTimeFilterParams(**dict(schema))
+
+
+def _stats_row(r: dict) -> dict:
+    """Project one OpeningStatsService row onto the keys the table renders."""
+    return {
+        "opening_id": r["opening_id"],
+        "eco_code": r["opening__eco_code"],
+        "name": r["opening__name"],
+        "moves": r["opening__moves"],
+        "game_count": r["game_count"],
+        "white_wins": r["white_wins"],
+        "draws": r["draws"],
+        "black_wins": r["black_wins"],
+        "white_pct": r["white_pct"],
+        "draw_pct": r["draw_pct"],
+        "black_pct": r["black_pct"],
+        "avg_moves": r["avg_moves"],
+    }
+
+
+def _get_cached_win_rate_over_time(params: WinRateOverTimeFilterParams) -> list[dict]:
+    """Return chart points for params, cached for CHART_CACHE_TIMEOUT seconds.
+
+    The key is a digest of every filter field, so any filter change misses
+    while sorting and paging (which do not affect the chart) hit.
+    """
+    digest = hashlib.sha256(repr(dataclasses.astuple(params)).encode()).hexdigest()
+    return cache.get_or_set(
+        f"win_rate_over_time:{digest}",
+        lambda: get_win_rate_over_time(params),
+        timeout=CHART_CACHE_TIMEOUT,
     )
 
 
-def _build_sort_urls(get_dict: dict) -> tuple[dict, dict, str, str]:
-    """Build sort query strings and per-column link info for the table headers.
+def _build_column_links(get_dict: dict) -> tuple[dict, str, str]:
+    """Build per-column sort link info for the table headers.
 
-    Sort links reset to page=1 so changing sort shows the first page of the
-    new order.
+    Only the link each header actually renders is encoded. Sort links reset
+    to page=1 so changing sort shows the first page of the new order.
 
     Returns:
-        Tuple of (sort_urls, column_links, current_sort_by, current_order).
+        Tuple of (column_links, current_sort_by, current_order).
         column_links keys: eco_code, name, moves, game_count, white_wins, draws,
         black_wins, avg_moves; each value is {"url": "...", "indicator": "↑"|"↓"|""}.
     """
-    sort_urls = {}
-    for sort_by in ALLOWED_SORT_FIELDS:
-        for order in ("asc", "desc"):
-            key = f"{sort_by}_{order}"
-            q = {**get_dict, "sort_by": sort_by, "order": order, "page": "1"}
-            sort_urls[key] = "?" + urlencode(q)
+
+    def sort_url(sort_by: str, order: str) -> str:
+        q = {**get_dict, "sort_by": sort_by, "order": order, "page": "1"}
+        return "?" + urlencode(q)
+
     current_sort_by = get_dict.get("sort_by") or "game_count"
     current_order = get_dict.get("order") or "desc"
     if current_sort_by not in ALLOWED_SORT_FIELDS:
@@ -147,52 +173,59 @@ def _build_sort_urls(get_dict: dict) -> tuple[dict, dict, str, str]:
         if current_sort_by == field:
             next_order = "asc" if current_order == "desc" else "desc"
             column_links[field] = {
-                "url": sort_urls[f"{field}_{next_order}"],
+                "url": sort_url(field, next_order),
                 "indicator": "↓" if current_order == "desc" else "↑",
             }
         else:
             column_links[field] = {
-                "url": sort_urls[f"{field}_desc"],
+                "url": sort_url(field, "desc"),
                 "indicator": "",
             }
 
     # Results column: desc = white_pct desc (white perspective), asc = black_pct desc (black perspective)
     if current_sort_by == "white_pct" and current_order == "desc":
         column_links["results"] = {
-            "url": sort_urls["black_pct_desc"],
+            "url": sort_url("black_pct", "desc"),
             "indicator": "↓",
             "label": "Results",
         }
     elif current_sort_by == "black_pct" and current_order == "desc":
         column_links["results"] = {
-            "url": sort_urls["white_pct_desc"],
+            "url": sort_url("white_pct", "desc"),
             "indicator": "↑",
             "label": "Results",
         }
     else:
         column_links["results"] = {
-            "url": sort_urls["white_pct_desc"],
+            "url": sort_url("white_pct", "desc"),
             "indicator": "",
             "label": "Results",
         }
 
-    return sort_urls, column_links, current_sort_by, current_order
+    return column_links, current_sort_by, current_order
+
 
+def _build_pagination(
+    get_dict: dict, total_count: int, filter_params: OpeningStatsFilterParams
+) -> dict:
+    """Build pagination context for the partial and full page.
 
-def _build_pagination(get_dict: dict, total_count: int) -> dict:
-    """Build pagination context for the partial and full page."""
-    page = max(1, int(get_dict.get("page") or 1))
-    page_size = max(1, min(100, int(get_dict.get("page_size") or 10)))
-    total_pages = max(1, (total_count + page_size - 1) // page_size)
-    page = min(page, total_pages)
+    Page and page size come from the validated filter params, so malformed
+    query values fall back to the same defaults the stats query used.
+    """
+    page_size = min(PAGE_SIZE_MAX, max(1, filter_params.page_size))
+    full_pages, remainder = divmod(total_count, page_size)
+    total_pages = max(1, full_pages + bool(remainder))
+    page = min(max(1, filter_params.page), total_pages)
+    query = dict(get_dict)
     prev_url = None
     if page > 1:
-        q = {**get_dict, "page": str(page - 1)}
-        prev_url = "?" + urlencode(q)
+        query["page"] = str(page - 1)
+        prev_url = "?" + urlencode(query)
     next_url = None
     if page < total_pages:
-        q = {**get_dict, "page": str(page + 1)}
-        next_url = "?" + urlencode(q)
+        query["page"] = str(page + 1)
+        next_url = "?" + urlencode(query)
     return {
         "page": page,
         "page_size": page_size,
@@ -208,36 +241,30 @@ def explore_openings(request):
 
     Uses OpeningStatsService with filters from GET. On validation error,
     falls back to default params and shows an error message on the full page.
+    Sort and pagination requests targeting the stats table get only the
+    table partial, without running the chart query.
     """
-    filter_params, form_data, validation_error = _get_params_from_request(request)
-    service = OpeningStatsService()
-    results, total_count = service.get_stats(filter_params)
-
-    stats = [
-        {
-            "opening_id": r["opening_id"],
-            "eco_code": r["opening__eco_code"],
-            "name": r["opening__name"],
-            "moves": r["opening__moves"],
-            "game_count": r["game_count"],
-            "white_wins": r["white_wins"],
-            "draws": r["draws"],
-            "black_wins": r["black_wins"],
-            "white_pct": r["white_pct"],
-            "draw_pct": r["draw_pct"],
-            "black_pct": r["black_pct"],
-            "avg_moves": (
-                round(r["avg_moves"], 2) if r["avg_moves"] is not None else None
-            ),
-        }
-        for r in results
-    ]
-    total = total_count
     get_dict = request.GET.dict()
-    sort_urls, column_links, current_sort_by, current_order = _build_sort_urls(get_dict)
-    pagination = _build_pagination(get_dict, total_count)
-    chart_params = _get_chart_params_from_request(request)
-    chart_items = get_win_rate_over_time(chart_params)
+    filter_params, form_data, validation_error = _get_params_from_request(get_dict)
+    results, total_count = OPENING_STATS_SERVICE.get_stats(filter_params)
+    column_links, current_sort_by, current_order = _build_column_links(get_dict)
+    pagination = _build_pagination(get_dict, total_count, filter_params)
+    table_ctx = {
+        "stats": [_stats_row(r) for r in results],
+        "total": total_count,
+        "column_links": column_links,
+        "current_sort_by": current_sort_by,
+        "current_order": current_order,
+        "pagination": pagination,
+    }
+    if (
+        request.headers.get("HX-Request")
+        and request.headers.get("HX-Target") == STATS_TABLE_TARGET
+    ):
+        return render(request, "partials/opening_stats_table.html", table_ctx)
+
+    chart_params = _get_chart_params_from_request(get_dict)
+    chart_items = _get_cached_win_rate_over_time(chart_params)
     chart_message = None
     if chart_params.date_from is not None:
         if not chart_params.date_to:
@@ -249,13 +276,7 @@ def explore_openings(request):
             chart_items = []
             chart_message = "Increase date range to generate historical chart."
     partial_ctx = {
-        "stats": stats,
-        "total": total,
-        "sort_urls": sort_urls,
-        "column_links": column_links,
-        "current_sort_by": current_sort_by,
-        "current_order": current_order,
-        "pagination": pagination,
+        **table_ctx,
         "chart_items": chart_items,
         "chart_message": chart_message,
     }
@@ -266,6 +287,8 @@ def explore_openings(request):
             "partials/explore_results.html",
             partial_ctx,
         )
+
+    # Full page only: surface the first validation error above the form.
     error_message = None
     if validation_error is not None:
         errs = validation_error.errors()
@@ -275,17 +298,9 @@ def explore_openings(request):
         request,
         "explore.html",
         {
-            "stats": stats,
-            "total": total,
+            **partial_ctx,
             "form_data": form_data,
             "validation_error_message": error_message,
-            "sort_urls": sort_urls,
-            "column_links": column_links,
-            "current_sort_by": current_sort_by,
-            "current_order": current_order,
-            "pagination": pagination,
-            "chart_items": chart_items,
-            "chart_message": chart_message,
         },
     )
 
@@ -296,8 +311,8 @@ def latest_game_for_opening(request, opening_id: int):
     Returns 404 if the opening does not exist. If the opening has no games,
     renders a message instead of 404.
     """
-    opening = get_object_or_404(Opening, pk=opening_id)
-    game = get_latest_game_for_opening(opening_id)
+    opening = get_object_or_404(Opening.objects.only("eco_code", "name"), pk=opening_id)
+    game = get_latest_game_for_opening(opening_id, fields=LATEST_GAME_FIELDS)
     moves_table = _parse_moves_to_table(game.moves) if game else []
     context = {"opening": opening, "game": game, "moves_table": moves_table}
     if request.headers.get("HX-Request"):